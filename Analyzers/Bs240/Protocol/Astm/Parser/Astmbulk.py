@@ -0,0 +1,148 @@
+"""
+Bulk decoding of captured ASTM traffic across a pool of worker processes.
+
+Usage (from the project root)::
+
+    python -m Analyzers.Bs240.Protocol.Astm.Parser.Astmbulk capture/*.bin --workers 32 -o decoded.jsonl
+"""
+from astm.constants import ENCODING, ETX
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from logging import getLogger, basicConfig, INFO
+from .Astmparser import split_at_stx, decode_message, decode_frame_sequence, delimiters_from_header, DelimiterState
+import argparse
+import json
+import os
+import sys
+
+log = getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 256
+
+def split_messages(transmission: bytes) -> list:
+    """
+    Split a transmission at message boundaries.
+
+    Frames are cut at STX and grouped until the frame carrying ETX, so a
+    record continued over intermediate (ETB) frames stays in one unit.
+
+    :return: List of frame lists, one per message
+    """
+    messages = []
+    frames = []
+    for frame in split_at_stx(transmission):
+        frames.append(frame)
+        if ETX in frame:
+            messages.append(frames)
+            frames = []
+    if frames:
+        messages.append(frames)
+    return messages
+
+def declared_delimiters(frame: bytes):
+    """Delimiters declared by an H record at the start of a frame, or None"""
+    body = frame[1:]
+    if body[:1].isdigit():
+        body = body[1:]
+    return delimiters_from_header(body)
+
+def _decode_batch(batch, encoding):
+    """Decode a batch of (delimiters, frames) messages inside a worker process."""
+    decoded = []
+    for delimiters, frames in batch:
+        state = DelimiterState(encoding, delimiters=delimiters)
+        try:
+            if len(frames) == 1:
+                seq, records, cs = decode_message(frames[0], encoding, state=state)
+            else:
+                records = decode_frame_sequence(frames, encoding, state=state)
+            decoded.extend(records)
+        except Exception as e:
+            log.warning('Failed to decode message: %s', e)
+    return decoded
+
+def _iter_batches(transmissions, batch_size):
+    """
+    Group the messages of all transmissions into batches of batch_size.
+
+    Each message goes with the delimiters in effect where it starts: those
+    declared by the transmission's last H record so far, or None.
+    """
+    batch = []
+    for transmission in transmissions:
+        delimiters = None
+        for message in split_messages(transmission):
+            delimiters = declared_delimiters(message[0]) or delimiters
+            batch.append((delimiters, message))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+def decode_many(transmissions, workers=None, encoding=ENCODING, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Decode many ASTM transmissions in parallel.
+
+    Messages are fanned out to a ProcessPoolExecutor in batches and the
+    decoded records are yielded back in input order. Only a bounded number
+    of batches is in flight, so arbitrarily large archives can be streamed.
+
+    :param transmissions: Iterable of raw transmission bytes
+    :param workers: Number of worker processes (defaults to the CPU count)
+    :param encoding: Text encoding
+    :param batch_size: Number of messages sent to a worker per task
+    :return: Generator of decoded records
+    """
+    workers = workers or os.cpu_count() or 1
+    batches = _iter_batches(transmissions, batch_size)
+
+    if workers == 1:
+        for batch in batches:
+            yield from _decode_batch(batch, encoding)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        try:
+            for batch in batches:
+                in_flight.append(executor.submit(_decode_batch, batch, encoding))
+                # Keep every worker busy while holding only a few batches
+                if len(in_flight) >= workers * 2:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Decode captured ASTM transmissions in parallel.')
+    parser.add_argument('files', nargs='+', help='Raw capture files, one transmission per file')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('-b', '--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Messages per worker task')
+    parser.add_argument('-e', '--encoding', default=ENCODING, help='Text encoding of the capture')
+    parser.add_argument('-o', '--output', default=None, help='Output JSON lines file (default: stdout)')
+    args = parser.parse_args(argv)
+    # Progress and warnings go to stderr, stdout may carry the JSON lines
+    basicConfig(stream=sys.stderr, level=INFO, format='%(levelname)s %(name)s: %(message)s')
+
+    def read_files():
+        for path in args.files:
+            with open(path, 'rb') as f:
+                yield f.read()
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        count = 0
+        for record in decode_many(read_files(), args.workers, args.encoding, args.batch_size):
+            out.write(json.dumps(record))
+            out.write('\n')
+            count += 1
+        log.info('Decoded %d records from %d files', count, len(args.files))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+Bulk order download: encode and frame a worklist in parallel while it is sent.
+
+Usage::
+
+    download = OrderDownload(worklist, template=get_template('BS240'), workers=4)
+    for frame in download:
+        send_and_wait_for_ack(frame)
+"""
+from astm.constants import ENCODING
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from logging import getLogger
+from queue import Queue, Full
+from config import MAX_FRAME_BODY_SIZE
+from .Astmparser import make_frame, get_record_encoder
+import os
+import threading
+
+log = getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_BATCH_SIZE = 32
+
+# End of the frame stream in the queue
+_DONE = object()
+
+def group_patients(worklist):
+    """
+    Group worklist records into per-patient blocks.
+
+    A block starts at every P record and holds the O, C... records that
+    follow it. Records before the first P record form a block of their own.
+
+    :param worklist: Iterable of records without the H and L records
+    :return: Generator of record lists
+    """
+    block = []
+    for record in worklist:
+        if record[0] == 'P' and block:
+            yield block
+            block = []
+        block.append(record)
+    if block:
+        yield block
+
+def frame_body(body: bytes, chunk_size=MAX_FRAME_BODY_SIZE, is_final=False) -> list:
+    """
+    Frame encoded records numbering the frames from 1.
+
+    Every frame ends in ETB unless `is_final`, then the last one ends in ETX.
+    Use :func:`renumber_frame` to fit the frames into a longer transmission.
+    """
+    frames = []
+    frame_number = 1
+    total = len(body)
+    for i in range(0, total, chunk_size):
+        frames.append(make_frame(frame_number, body[i:i + chunk_size], is_final and i + chunk_size >= total))
+        frame_number = 1 if frame_number == 7 else frame_number + 1
+    return frames
+
+def renumber_frame(frame: bytes, frame_number: int) -> bytes:
+    """Give a frame another frame number, adjusting its checksum by the difference"""
+    digit = 48 + frame_number
+    delta = digit - frame[1]
+    if not delta:
+        return frame
+    checksum = (int(frame[-4:-2], 16) + delta) & 0xFF
+    return b'%c%c%b%02X\r\n' % (frame[0], digit, frame[2:-4], checksum)
+
+def _frame_batch(blocks, chunk_size, encoding):
+    """Encode and frame a batch of patient blocks inside a worker."""
+    encoder = get_record_encoder()
+    body = b''.join((encoder.encode_records(block) + '\r').encode(encoding) for block in blocks)
+    return frame_body(body, chunk_size)
+
+def _iter_batches(worklist, batch_size):
+    batch = []
+    for block in group_patients(worklist):
+        batch.append(block)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class OrderDownload:
+    """
+    Frames of a worklist download, produced in the background.
+
+    The worklist is grouped into per-patient P/O blocks, batches of blocks
+    are encoded and framed by a pool of worker threads (or processes) and
+    the frames are renumbered in order and put on a bounded queue. Iterating
+    the download takes frames off the queue, so encoding runs alongside the
+    slow transmit and never more than `queue_size` frames ahead of it.
+
+    Frames of a batch end at the batch boundary, so intermediate frames can
+    be shorter than `chunk_size`. Only the terminator's last frame ends in ETX.
+    """
+
+    def __init__(self, worklist, header=None, terminator=('L', '1', 'N'), template=None, timestamp=None,
+                 workers=None, processes=False, chunk_size=MAX_FRAME_BODY_SIZE, encoding=ENCODING,
+                 batch_size=DEFAULT_BATCH_SIZE, queue_size=DEFAULT_QUEUE_SIZE):
+        """
+        :param worklist: Iterable of P, O, C... records (lists)
+        :param header: H record, used when no template is given
+        :param terminator: L record, used when no template is given
+        :param template: Analyzer :class:`MessageTemplate` for the H and L records
+        :param timestamp: Header timestamp when a template is used
+        :param workers: Number of workers (defaults to the CPU count)
+        :param processes: Encode in worker processes instead of threads
+        :param batch_size: Patient blocks per worker task
+        :param queue_size: Frames held ready for the transmit side
+        """
+        self.worklist = worklist
+        self.workers = workers or os.cpu_count() or 1
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.batch_size = batch_size
+        self.queue = Queue(maxsize=queue_size)
+
+        encoder = get_record_encoder()
+        if template is not None:
+            self._header = template.header(timestamp)
+            self._terminator = template.terminator
+        else:
+            self._header = (encoder.encode_record(header) + '\r').encode(encoding) if header else b''
+            self._terminator = (encoder.encode_record(list(terminator)) + '\r').encode(encoding)
+
+        self._frame_number = 1
+        self._cancelled = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start producing frames; iterating the download starts it too"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._produce, name='order-download', daemon=True)
+            self._thread.start()
+        return self
+
+    def cancel(self):
+        """Stop producing, e.g. when the analyzer refused the download"""
+        self._cancelled.set()
+        if self._thread is not None:
+            self._thread.join()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        # The producer puts nothing once cancelled, so end the stream here
+        # for a consumer still waiting on the queue
+        self.queue.put_nowait(_DONE)
+
+    def __iter__(self):
+        self.start()
+        while True:
+            item = self.queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def _produce(self):
+        try:
+            pool = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+            with pool(max_workers=self.workers) as executor:
+                in_flight = deque()
+                try:
+                    self._put_frames(frame_body(self._header, self.chunk_size))
+                    for batch in _iter_batches(self.worklist, self.batch_size):
+                        if self._cancelled.is_set():
+                            return
+                        in_flight.append(executor.submit(_frame_batch, batch, self.chunk_size, self.encoding))
+                        # Keep every worker busy while holding only a few batches
+                        if len(in_flight) >= self.workers * 2:
+                            self._put_frames(in_flight.popleft().result())
+                    while in_flight:
+                        self._put_frames(in_flight.popleft().result())
+                    self._put_frames(frame_body(self._terminator, self.chunk_size, is_final=True))
+                finally:
+                    for future in in_flight:
+                        future.cancel()
+        except Exception as e:
+            log.error('Order download failed: %s', e)
+            self._put(e)
+        finally:
+            self._put(_DONE)
+
+    def _put_frames(self, frames):
+        frame_number = self._frame_number
+        for frame in frames:
+            self._put(renumber_frame(frame, frame_number))
+            frame_number = 1 if frame_number == 7 else frame_number + 1
+        self._frame_number = frame_number
+
+    def _put(self, item):
+        # Blocks while the transmit side is behind, unless cancelled
+        while not self._cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except Full:
+                continue
@@ -1,13 +1,21 @@
-from astm.constants import ENCODING, STX, ETX, CR,LF, ETB, REPEAT_SEP, COMPONENT_SEP, RECORD_SEP, CRLF
+from astm.constants import ENCODING, STX, ETX, ETB, FIELD_SEP, REPEAT_SEP, COMPONENT_SEP, ESCAPE_SEP, RECORD_SEP, CRLF
 from astm.codec import make_checksum
 from logging import getLogger
+from collections.abc import Sequence
+import re
+import string
 from ..Records.HeaderRecord import ExtraHeaderFields
 from ..Records.CommentRecord import ExtendedCommentRecord
 from ..Records.PatientRecord import ExtendedPatientRecord
 from ..Records.OrderRecord import ExtendedOrderRecord
 from ..Records.ResultRecord import ExtendedResultRecord
-import json        
-from config import MAX_FRAME_BODY_SIZE
+from ..Records.Serializer import PRETTY
+from config import MAX_FRAME_BODY_SIZE, INTERN_TABLE_SIZE
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, verify_frames falls back to pure Python
+    np = None
 
 log = getLogger(__name__)
 
@@ -22,33 +30,93 @@ def buildAstmMessage(message: str, frame_number: int = 1) -> bytes:
                  b'\r\n')
     return astm_bytes
 
-def build_astm_frames(message: str, chunk_size: int = MAX_FRAME_BODY_SIZE) -> list[bytes]:
-    """Break a full ASTM message into correctly framed ASTM protocol-compliant frames"""
+# STX + frame number + ETX/ETB + 2 checksum digits + CR + LF
+FRAME_OVERHEAD = 7
+
+# Frame number -> STX and frame digit
+_FRAME_HEADS = [STX + b'%d' % number for number in range(8)]
+# ETX/ETB -> checksum byte -> terminator, checksum digits and CRLF
+_FRAME_TAILS = {
+    terminator: [b'%c%02X\r\n' % (terminator, checksum) for checksum in range(256)]
+    for terminator in (ETX[0], ETB[0])
+}
+
+def _chunk_sums(data: memoryview, chunk_size: int) -> list:
+    """Byte sum of every `chunk_size` slice of data, in one NumPy pass when available"""
+    if np is None or not data:
+        # Summing bytes slices is much faster than summing memoryview slices
+        data = bytes(data)
+        return [sum(data[i:i + chunk_size]) for i in range(0, len(data), chunk_size)]
+    starts = np.arange(0, len(data), chunk_size)
+    return np.add.reduceat(np.frombuffer(data, dtype=np.uint8), starts, dtype=np.uint64).tolist()
+
+def make_frame(frame_number: int, body: bytes, is_final: bool, body_sum: int = None) -> bytes:
+    """
+    Frame an encoded body: STX, frame number, body, ETX/ETB, checksum, CRLF.
+    
+    :param frame_number: Frame number, 1 to 7
+    :param is_final: End the frame with ETX instead of ETB
+    :param body_sum: Byte sum of `body` when already known
+    """
+    digit = 48 + frame_number
+    terminator = ETX[0] if is_final else ETB[0]
+    if body_sum is None:
+        body_sum = sum(body)
+    checksum = (digit + body_sum + terminator) & 0xFF
+    return b'\x02%c%b%c%02X\r\n' % (digit, body, terminator, checksum)
+
+def build_astm_frame_views(message, chunk_size: int = MAX_FRAME_BODY_SIZE,
+                           encoding: str = ENCODING) -> tuple[bytearray, list[memoryview]]:
+    """
+    Frame a full ASTM message into one preallocated buffer.
+    
+    The message is encoded once and cut into bodies of at most `chunk_size`
+    encoded bytes. Every frame (STX, frame number, body, ETX/ETB, checksum,
+    CRLF) is written straight into a single bytearray, so the whole
+    transmission can go out with one ``sendall`` or frame by frame.
+    
+    :param message: Message as str, or as already encoded bytes
+    :param chunk_size: Maximum frame body size in bytes
+    :return: The framed buffer and a memoryview per frame into it
+    """
+    data = memoryview(message.encode(encoding) if isinstance(message, str) else message)
+    total = len(data)
+    count = -(-total // chunk_size)
+    buffer = bytearray(total + count * FRAME_OVERHEAD)
+    view = memoryview(buffer)
+    
     frames = []
+    pos = 0
     frame_number = 1
-    
-    for i in range(0, len(message), chunk_size):
-        chunk = message[i:i+chunk_size]
-        is_last_frame = (i + chunk_size >= len(message))
-        
-        # Frame structure: STX + frame_number + data + ETX/ETB + checksum + CR + LF
-        frame_body = f"{frame_number}{chunk}"
-        frame_end = ETX.decode() if is_last_frame else ETB.decode()
-        checksum = make_checksum(frame_body + frame_end)
-        
-        framed = (
-            STX +
-            frame_body.encode(ENCODING) +
-            frame_end.encode() +
-            checksum.encode(ENCODING) +
-            CR + LF
-        )
-        frames.append(framed)
+    for i, body_sum in zip(range(0, total, chunk_size), _chunk_sums(data, chunk_size)):
+        body = data[i:i + chunk_size]
+        terminator = ETX[0] if i + chunk_size >= total else ETB[0]
+        # Every part is copied straight into the frame's slot of the buffer
+        start = pos + 2
+        end = start + len(body)
+        buffer[pos:start] = _FRAME_HEADS[frame_number]
+        buffer[start:end] = body
+        buffer[end:end + 5] = _FRAME_TAILS[terminator][(48 + frame_number + body_sum + terminator) & 0xFF]
+        frames.append(view[pos:end + 5])
+        pos = end + 5
         frame_number = 1 if frame_number == 7 else frame_number + 1
     
-    return frames
+    return buffer, frames
+
+def build_astm_buffer(message, chunk_size: int = MAX_FRAME_BODY_SIZE, encoding: str = ENCODING) -> bytearray:
+    """Frame a full ASTM message into one buffer ready for ``sendall``"""
+    return build_astm_frame_views(message, chunk_size, encoding)[0]
+
+def build_astm_frames(message: str, chunk_size: int = MAX_FRAME_BODY_SIZE) -> list[memoryview]:
+    """
+    Break a full ASTM message into correctly framed ASTM protocol-compliant frames.
+    
+    The frames are memoryviews into one buffer (see :func:`build_astm_frame_views`);
+    ``bytes(frame)`` gives a standalone copy.
+    """
+    return build_astm_frame_views(message, chunk_size)[1]
 
-def enhanced_decode(data, encoding=ENCODING):
+def enhanced_decode(data, encoding=ENCODING, lazy=False, analyzer=None, projection=None):
     """
     Enhanced ASTM decoder that handles:
     1. Single complete messages
@@ -57,11 +125,20 @@ def enhanced_decode(data, encoding=ENCODING):
     4. Raw record data
     
     :param data: ASTM data (bytes or list of frame bytes)
+    :param lazy: Return :class:`LazyRecord` views instead of lists
+    :param analyzer: Analyzer name, selects the analyzer's decoders and intern table
+    :param projection: Field indexes to decode per record type, e.g.
+                       ``{'O': [2, 4], 'R': [2, 3, 4, 6]}`` (see :class:`Projection`)
     :return: List of decoded records
     """
+    if projection is not None and not isinstance(projection, Projection):
+        projection = Projection(projection)
+    # Delimiters declared by an H record apply to the rest of this data only
+    state = DelimiterState(encoding, analyzer)
+    
     if isinstance(data, list):
         # Handle list of frames
-        return decode_frame_sequence(data, encoding)
+        return decode_frame_sequence(data, encoding, lazy, analyzer, projection, state)
     
     if not isinstance(data, bytes):
         raise TypeError('bytes or list expected, got %r' % type(data))
@@ -72,49 +149,74 @@ def enhanced_decode(data, encoding=ENCODING):
     if stx_count == 0:
         # No STX - treat as raw record or frame content
         if data[:1].decode().isdigit():
-            seq, records = decode_frame(data, encoding)
+            seq, records = decode_frame(data, encoding, lazy, analyzer, projection, state)
             return records
-        return [decode_record(data, encoding)]
+        return [decode_record(data, encoding, lazy, analyzer, projection, state)]
     
     elif stx_count == 1:
         # Single message
-        seq, records, cs = decode_message(data, encoding)
+        seq, records, cs = decode_message(data, encoding, lazy, analyzer, projection, state)
         return records
     
     else:
         # Multiple messages
-        return decode_multiple_messages(data, encoding)
+        return decode_multiple_messages(data, encoding, lazy, analyzer, projection=projection, state=state)
 
-def decode_frame_sequence(frames, encoding=ENCODING):
+def decode_frame_sequence(frames, encoding=ENCODING, lazy=False, analyzer=None, projection=None, state=None):
     """
     Decode a sequence of related frames.
     
+    Frame bodies are collected once and their records decoded directly,
+    without re-framing them into a synthetic message.
+    
     :param frames: List of frame bytes
     :param encoding: Text encoding
     :return: List of decoded records
     """
-    # Aggregate frames into single message
-    aggregated_message, all_valid = aggregate_frames(frames)
+    content, all_valid = collect_frame_bodies(frames)
     
     if not all_valid:
-        print('Warning: Some frames had checksum errors')
+        log.warning('Some frames had checksum errors')
     
-    # Decode the aggregated message
-    return enhanced_decode(aggregated_message, encoding)
+    return decode_records(content, encoding, lazy, analyzer, projection, state)
 
-def decode_multiple_messages(data, encoding):
-    """Decode multiple concatenated ASTM messages."""
+def decode_multiple_messages(data, encoding, lazy=False, analyzer=None, quarantine=None, projection=None,
+                             state=None):
+    """
+    Decode multiple concatenated ASTM messages.
+    
+    :param quarantine: Optional :class:`FrameQuarantine`. When given, messages
+                       failing their checksum or decode are quarantined with
+                       their offset instead of being logged, and decoding
+                       continues with the next message.
+    :param state: :class:`DelimiterState` shared by the messages, a new one by default
+    """
+    if state is None:
+        state = DelimiterState(encoding, analyzer)
     all_records = []
     messages = split_at_stx(data)
+    offset = data.find(STX)
     
     for i, message in enumerate(messages):
         if message:
             try:
-                seq, records, cs = decode_message(message, encoding)
+                if quarantine is not None:
+                    end, cs = _locate_checksum(message)
+                    if cs and checksum_bytes(memoryview(message)[1:end]) != cs:
+                        quarantine.add(offset, 'checksum', message)
+                        offset += len(message)
+                        continue
+                seq, records, cs = decode_message(message, encoding, lazy, analyzer, projection, state)
                 all_records.extend(records)
+                if quarantine is not None:
+                    quarantine.counters['frames_accepted'] += 1
+                    quarantine.counters['records_decoded'] += len(records)
             except Exception as e:
-                print(f"Warning: Failed to decode message {i+1}: {e}")
-                continue
+                if quarantine is None:
+                    log.warning('Failed to decode message %d: %s', i + 1, e)
+                else:
+                    quarantine.add(offset, f'decode error: {e}', message)
+        offset += len(message)
     
     return all_records
 
@@ -141,7 +243,7 @@ def split_at_stx(data):
     
     return messages
 
-def decode_message(message, encoding):
+def decode_message(message, encoding, lazy=False, analyzer=None, projection=None, state=None):
     """Decode a complete ASTM message."""
     if not isinstance(message, bytes):
         raise TypeError('bytes expected, got %r' % message)
@@ -165,17 +267,17 @@ def decode_message(message, encoding):
     cs = trailer.rstrip(CRLF)
     
     if cs:
-        ccs = make_checksum(frame_for_checksum).encode()
+        ccs = checksum_bytes(frame_for_checksum)
         if cs != ccs:
-            print(f'Checksum failure: expected {ccs}, calculated {cs}')
+            log.warning('Checksum failure: expected %s, calculated %s', ccs, cs)
 
     # Decode frame content (without ETX/ETB)
     frame_content = frame_for_checksum[:-1]
-    seq, records = decode_frame(frame_content, encoding)
+    seq, records = decode_frame(frame_content, encoding, lazy, analyzer, projection, state)
 
     return seq, records, cs.decode('ascii') if cs else None
 
-def decode_frame(frame, encoding):
+def decode_frame(frame, encoding, lazy=False, analyzer=None, projection=None, state=None):
     """Decode ASTM frame content."""
     if not isinstance(frame, bytes):
         raise TypeError('bytes expected, got %r' % frame)
@@ -189,60 +291,745 @@ def decode_frame(frame, encoding):
         seq = None
         records_data = frame
 
-    # Split records by CR and decode each
-    return seq, [decode_record(record, encoding)
-                 for record in records_data.split(RECORD_SEP) if record]
+    return seq, decode_records(records_data, encoding, lazy, analyzer, projection, state)
 
-def decode_record(record, encoding):
-    """Decode individual ASTM record."""
-    fields = []
-    items = record.split(b'|')
+def decode_records(records_data, encoding, lazy=False, analyzer=None, projection=None, state=None):
+    """
+    Split records by CR and decode each.
     
-    for i, item in enumerate(items):
-        # Special handling for header delimiters
-        if i == 1 and items[0].startswith(b'H') and len(item) in (3, 4):
-            delim_chars = [chr(b) for b in item]
-            fields.append(delim_chars)
+    An H record switches to the decoder for the delimiters it declares,
+    which is then used for the records that follow it.
+    
+    :param state: :class:`DelimiterState` of the transmission, a new one by default
+    """
+    if projection is not None and not isinstance(projection, Projection):
+        projection = Projection(projection)
+    if state is None:
+        state = DelimiterState(encoding, analyzer)
+    
+    records = []
+    for record in records_data.split(RECORD_SEP):
+        if not record:
+            continue
+        decoder = state.decoder_for(record)
+        wanted = projection.get(record[:1]) if projection else None
+        if wanted is None:
+            records.append(decoder.decode_record(record, lazy))
         else:
-            if REPEAT_SEP in item:
-                item = decode_repeated_component(item, encoding)
-            elif COMPONENT_SEP in item:
-                item = decode_component(item, encoding)
-            else:
-                item = item.decode(encoding) if item else None
-            fields.append(item if item else None)
+            records.append(decoder.decode_projected(record, wanted))
+    return records
+
+def decode_record(record, encoding, lazy=False, analyzer=None, projection=None, state=None):
+    """
+    Decode individual ASTM record.
+    
+    :param lazy: Return a :class:`LazyRecord` that decodes fields on access
+    :param analyzer: Analyzer name, selects the analyzer's decoders and intern table
+    :param projection: Field indexes to decode per record type
+    :param state: :class:`DelimiterState` of the transmission the record is
+                  part of; without one the default delimiters are used unless
+                  the record is an H record declaring others
+    """
+    if state is None:
+        state = DelimiterState(encoding, analyzer)
+    decoder = state.decoder_for(record)
     
-    return fields
+    if projection is not None:
+        if not isinstance(projection, Projection):
+            projection = Projection(projection)
+        wanted = projection.get(record[:1])
+        if wanted is not None:
+            return decoder.decode_projected(record, wanted)
+    return decoder.decode_record(record, lazy)
+
+def decode_field(item, encoding):
+    """Decode a single field into a str, component list or repeat list."""
+    return get_record_decoder(DEFAULT_DELIMITERS, encoding).decode_field(item)
 
 def decode_component(field, encoding):
     """Decode component-separated field."""
-    components = []
-    for item in field.split(COMPONENT_SEP):
-        if item:
-            components.append(item.decode(encoding))
-        else:
-            components.append(None)
-    
-    return components if len(components) > 1 else (components[0] if components else None)
+    return get_record_decoder(DEFAULT_DELIMITERS, encoding).decode_component(field)
 
 def decode_repeated_component(component, encoding):
     """Decode repeat-separated components."""
-    repeats = []
-    for item in component.split(REPEAT_SEP):
-        if COMPONENT_SEP in item:
-            repeats.append(decode_component(item, encoding))
-        else:
-            repeats.append(item.decode(encoding) if item else None)
+    return get_record_decoder(DEFAULT_DELIMITERS, encoding).decode_repeated_component(component)
+
+class Projection(dict):
+    """
+    Field projection for routing-only decodes: record type -> wanted indexes.
+    
+    Built from a mapping such as ``{'O': [2, 4], 'R': [2, 3, 4, 6]}``, where
+    indexes are positions in the decoded record list (0 is the record type).
+    Record types that are not listed are decoded in full; an empty list
+    decodes only the record type.
+    """
+    
+    def __init__(self, projection):
+        super().__init__(
+            (rtype.encode(ENCODING)[:1] if isinstance(rtype, str) else bytes(rtype[:1]), frozenset(fields))
+            for rtype, fields in projection.items()
+        )
+
+# Field, repeat, component and escape delimiters, in H record order
+DEFAULT_DELIMITERS = FIELD_SEP + REPEAT_SEP + COMPONENT_SEP + ESCAPE_SEP
+
+# Low-cardinality fields whose values are interned, per record type:
+# H sender, receiver, processing ID, version; P sex; O test, priority,
+# action code, specimen descriptor, report type; R test, units, reference
+# range, flag, status, operator, instrument (the BS-240 also sends its name
+# in field 14); C source, type; L code
+INTERN_FIELDS = {
+    'H': (4, 9, 11, 12),
+    'P': (8,),
+    'O': (4, 5, 11, 15, 25),
+    'R': (2, 4, 5, 6, 8, 10, 13, 14),
+    'C': (2, 4),
+    'L': (2,),
+}
+
+class InternTable:
+    """
+    Bounded table of canonical strings for one analyzer's repeated values.
+    
+    Test codes, units, flags and sender names recur in nearly every record;
+    interning them makes every decoded record share one str object per value
+    instead of holding its own copy. Only the fields listed in `fields` are
+    interned, and once `max_size` strings are held new values are passed
+    through without being added.
+    """
+    
+    def __init__(self, max_size=INTERN_TABLE_SIZE, fields=INTERN_FIELDS):
+        self.max_size = max_size
+        self.fields = fields
+        self.hits = 0
+        self.misses = 0
+        self._strings = {}
+    
+    def __len__(self):
+        return len(self._strings)
+    
+    def __repr__(self):
+        return f"InternTable(size={len(self._strings)}, max_size={self.max_size}, hit_rate={self.hit_rate:.1%})"
+    
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def intern(self, value):
+        """Canonical object for a str, components and repeats interned in place"""
+        if isinstance(value, str):
+            canonical = self._strings.get(value)
+            if canonical is not None:
+                self.hits += 1
+                return canonical
+            self.misses += 1
+            if len(self._strings) < self.max_size:
+                self._strings[value] = value
+            return value
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                if item is not None:
+                    value[i] = self.intern(item)
+        return value
+    
+    def intern_record(self, fields):
+        """Intern the low-cardinality fields of a decoded record in place"""
+        record_type = fields[0] if fields else None
+        positions = self.fields.get(record_type) if isinstance(record_type, str) else None
+        if positions:
+            size = len(fields)
+            for i in positions:
+                if i < size and fields[i] is not None:
+                    fields[i] = self.intern(fields[i])
+        return fields
+    
+    def stats(self) -> dict:
+        return {
+            'size': len(self._strings),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+        }
+    
+    def clear(self):
+        self._strings.clear()
+        self.hits = self.misses = 0
+
+# analyzer -> InternTable shared by the analyzer's decoders
+_INTERN_TABLES = {}
+
+def get_intern_table(analyzer=None) -> InternTable:
+    """Return the intern table of an analyzer (None for an unnamed link)"""
+    table = _INTERN_TABLES.get(analyzer)
+    if table is None:
+        table = _INTERN_TABLES[analyzer] = InternTable()
+    return table
+
+class RecordDecoder:
+    """
+    Record decoder specialised for one delimiter set.
+    
+    Built once per delimiter set (see :func:`get_record_decoder`) with the
+    separators bound up front. Fields, repeats and components are split by a
+    single compiled-regex scan per record, and ASTM escape sequences
+    (``&F&``, ``&S&``, ``&R&``, ``&E&``) are un-escaped on the way.
+    
+    With an :class:`InternTable` the low-cardinality fields of eagerly
+    decoded records are replaced by their canonical strings.
+    """
+    
+    def __init__(self, delimiters: bytes = DEFAULT_DELIMITERS, encoding=ENCODING, interner=None):
+        if len(delimiters) != 4 or len(set(delimiters)) != 4:
+            raise ValueError('Four distinct delimiters expected, got %r' % delimiters)
+        self.delimiters = delimiters
+        self.field_sep = delimiters[0:1]
+        self.repeat_sep = delimiters[1:2]
+        self.component_sep = delimiters[2:3]
+        self.escape_sep = delimiters[3:4]
+        self.encoding = encoding
+        self.interner = interner
+        
+        self._splitter = re.compile(b'([' + re.escape(delimiters[:3]) + b'])')
+        escape = re.escape(self.escape_sep)
+        self._escapes = {
+            b'F': self.field_sep,
+            b'S': self.component_sep,
+            b'R': self.repeat_sep,
+            b'E': self.escape_sep,
+        }
+        self._escape_pattern = re.compile(escape + b'([FSRE])' + escape)
+    
+    def __repr__(self):
+        return f"RecordDecoder(delimiters={self.delimiters!r}, encoding={self.encoding!r})"
     
-    return repeats if len(repeats) > 1 else (repeats[0] if repeats else None)
+    def decode_record(self, record, lazy=False):
+        """Decode a record (bytes) into a list of fields"""
+        if lazy:
+            return LazyRecord(record, self.encoding, self)
+        
+        field_sep = self.field_sep
+        # Special handling for header delimiters, which must not be tokenized
+        if record.startswith(b'H'):
+            type_end = record.find(field_sep)
+            if type_end != -1:
+                delims_end = record.find(field_sep, type_end + 1)
+                if delims_end == -1:
+                    delims_end = len(record)
+                delims = record[type_end + 1:delims_end]
+                if len(delims) in (3, 4):
+                    fields = [self._decode_text(record[:type_end]), [chr(b) for b in delims]]
+                    if delims_end < len(record):
+                        self._tokenize(record[delims_end + 1:], fields)
+                    if self.interner is not None:
+                        self.interner.intern_record(fields)
+                    return fields
+        
+        fields = self._tokenize(record, [])
+        if self.interner is not None:
+            self.interner.intern_record(fields)
+        return fields
+    
+    def decode_field(self, item):
+        """Decode a single field into a str, component list or repeat list"""
+        return self._tokenize(item, [])[0]
+    
+    def decode_projected(self, record, wanted):
+        """
+        Decode only the wanted fields of a record.
+        
+        The record is split no further than the highest wanted field. The
+        record type and wanted fields are decoded, fields in between are
+        left as raw bytes and the unsplit tail, if any, is appended as one
+        final raw bytes element.
+        
+        :param wanted: Collection of field indexes (0 is the record type)
+        """
+        highest = max(wanted, default=0)
+        items = record.split(self.field_sep, highest + 1)
+        is_header = items[0].startswith(b'H')
+        
+        fields = []
+        for i, item in enumerate(items[:highest + 1]):
+            if i and i not in wanted:
+                fields.append(item)
+            elif i == 1 and is_header and len(item) in (3, 4):
+                # Special handling for header delimiters
+                fields.append([chr(b) for b in item])
+            else:
+                fields.append(self.decode_field(item))
+        if len(items) > highest + 1:
+            fields.append(items[highest + 1])
+        if self.interner is not None:
+            self.interner.intern_record(fields)
+        return fields
+    
+    def decode_component(self, field):
+        """Decode component-separated field"""
+        decode_text = self._decode_text
+        components = [decode_text(item) for item in field.split(self.component_sep)]
+        return components if len(components) > 1 else (components[0] if components else None)
+    
+    def decode_repeated_component(self, component):
+        """Decode repeat-separated components"""
+        component_sep = self.component_sep
+        repeats = []
+        for item in component.split(self.repeat_sep):
+            if component_sep in item:
+                repeats.append(self.decode_component(item))
+            else:
+                repeats.append(self._decode_text(item))
+        return repeats if len(repeats) > 1 else (repeats[0] if repeats else None)
+    
+    def _decode_text(self, item):
+        """Decode and un-escape a single token, None when empty"""
+        if not item:
+            return None
+        if self.escape_sep in item:
+            escapes = self._escapes
+            item = self._escape_pattern.sub(lambda m: escapes[m.group(1)], item)
+        return item.decode(self.encoding)
+    
+    def _tokenize(self, data, fields):
+        """
+        Split fields, repeats and components in one scan and append the
+        decoded fields to `fields`.
+        """
+        tokens = self._splitter.split(data)
+        decode_text = self._decode_text
+        field_sep = self.field_sep
+        repeat_sep = self.repeat_sep
+        repeats = None
+        components = None
+        
+        value = decode_text(tokens[0])
+        for i in range(1, len(tokens), 2):
+            sep = tokens[i]
+            if sep == field_sep or sep == repeat_sep:
+                if components is not None:
+                    components.append(value)
+                    value = components
+                    components = None
+                if sep == repeat_sep:
+                    if repeats is None:
+                        repeats = []
+                    repeats.append(value)
+                else:
+                    if repeats is not None:
+                        repeats.append(value)
+                        value = repeats
+                        repeats = None
+                    fields.append(value)
+            else:
+                if components is None:
+                    components = []
+                components.append(value)
+            value = decode_text(tokens[i + 1])
+        
+        if components is not None:
+            components.append(value)
+            value = components
+        if repeats is not None:
+            repeats.append(value)
+            value = repeats
+        fields.append(value)
+        return fields
+
+# (analyzer, delimiters, encoding) -> RecordDecoder
+_RECORD_DECODERS = {}
+
+def get_record_decoder(delimiters=None, encoding=ENCODING, analyzer=None) -> RecordDecoder:
+    """
+    Return the cached decoder for a delimiter set and analyzer.
+    
+    Decoders hold no per-link state; which delimiters are in effect on a
+    link is tracked by a :class:`DelimiterState`.
+    
+    :param delimiters: Field, repeat, component and escape delimiters as
+                       bytes, None for the ASTM defaults
+    :param encoding: Text encoding
+    :param analyzer: Analyzer name, None for an unnamed link
+    """
+    if delimiters is None:
+        delimiters = DEFAULT_DELIMITERS
+    
+    key = (analyzer, delimiters, encoding)
+    decoder = _RECORD_DECODERS.get(key)
+    if decoder is None:
+        interner = get_intern_table(analyzer) if INTERN_TABLE_SIZE else None
+        decoder = _RECORD_DECODERS[key] = RecordDecoder(delimiters, encoding, interner)
+    return decoder
+
+# Bytes an H record may declare as delimiters
+DELIMITER_BYTES = frozenset(string.punctuation.encode('ascii'))
+
+def delimiters_from_header(record: bytes):
+    """
+    Read the delimiter set declared by an H record, e.g. b'H|\\^&|...'.
+    
+    The four delimiters must be distinct ASCII punctuation followed by the
+    field delimiter, so a record fragment that merely starts with H (such
+    as b'HDL^HDL Cholesterol|...') is not taken for a header.
+    
+    :return: Field, repeat, component and escape delimiters as bytes, or None
+    """
+    if not record.startswith(b'H'):
+        return None
+    delimiters = record[1:5]
+    if len(set(delimiters)) != 4 or record[5:6] != delimiters[:1] \
+            or not DELIMITER_BYTES.issuperset(delimiters):
+        return None
+    return delimiters
+
+class DelimiterState:
+    """
+    Delimiters in effect within one transmission.
+    
+    An H record declares the delimiters of the records that follow it. The
+    state holds the decoder for them and belongs to a single decode call or
+    :class:`AstmStreamDecoder`, which resets it on ENQ/EOT, so a header seen
+    on one link never changes how another link or a later call is decoded.
+    
+    A header is only honoured at the start of a message: as the first record
+    after a reset or the record following an L record. Anywhere else a
+    record starting with H is decoded with the delimiters in effect.
+    """
+    __slots__ = ('encoding', 'analyzer', 'decoder', 'at_message_start')
+    
+    def __init__(self, encoding=ENCODING, analyzer=None, delimiters=None):
+        """
+        :param delimiters: Delimiters already declared earlier in the
+                           transmission, None for the ASTM defaults
+        """
+        self.encoding = encoding
+        self.analyzer = analyzer
+        self.reset()
+        if delimiters is not None:
+            self.decoder = get_record_decoder(delimiters, encoding, analyzer)
+    
+    def reset(self):
+        """Back to the ASTM default delimiters, e.g. at the end of a transmission"""
+        self.decoder = get_record_decoder(DEFAULT_DELIMITERS, self.encoding, self.analyzer)
+        self.at_message_start = True
+    
+    def decoder_for(self, record: bytes) -> RecordDecoder:
+        """
+        Decoder for the next record of the transmission, switching delimiters
+        first if it is an H record declaring them at the start of a message
+        """
+        if self.at_message_start and record.startswith(b'H'):
+            delimiters = delimiters_from_header(record)
+            if delimiters is not None:
+                self.decoder = get_record_decoder(delimiters, self.encoding, self.analyzer)
+        decoder = self.decoder
+        # The message ends with its L record, the next one may be a header
+        self.at_message_start = record[:1] == b'L' and record[1:2] == decoder.field_sep
+        return decoder
+
+class RecordEncoder:
+    """
+    Record encoder specialised for one delimiter set, the counterpart of
+    :class:`RecordDecoder`.
+    
+    Fields may be None, text, numbers, component lists or repeat lists (a
+    list holding lists), as produced by the decoder. Delimiter characters
+    inside data are escaped as ``&F&``, ``&S&``, ``&R&`` and ``&E&``.
+    
+    Records are encoded in one pass into a single list joined once. Text
+    rarely holds delimiters, so the text fields of a whole message are
+    checked together and the message is only re-encoded field by field,
+    escaping, when that check hits.
+    """
+    
+    def __init__(self, delimiters=DEFAULT_DELIMITERS):
+        if isinstance(delimiters, (bytes, bytearray)):
+            delimiters = delimiters.decode(ENCODING)
+        if len(delimiters) != 4 or len(set(delimiters)) != 4:
+            raise ValueError('Four distinct delimiters expected, got %r' % delimiters)
+        self.delimiters = delimiters
+        field_sep, repeat_sep, component_sep, escape_sep = delimiters
+        self.field_sep = field_sep
+        self.repeat_sep = repeat_sep
+        self.component_sep = component_sep
+        self.escape_sep = escape_sep
+        
+        self._escapes = str.maketrans({
+            field_sep: escape_sep + 'F' + escape_sep,
+            component_sep: escape_sep + 'S' + escape_sep,
+            repeat_sep: escape_sep + 'R' + escape_sep,
+            escape_sep: escape_sep + 'E' + escape_sep,
+        })
+    
+    def encode_records(self, records, record_sep='\r') -> str:
+        """Encode records into one message string, records joined by `record_sep`"""
+        if not isinstance(records, (list, tuple)):
+            records = list(records)
+        field_sep = self.field_sep
+        component_sep = self.component_sep
+        encode_field = self.encode_field
+        delimiter_definition = self.delimiters[1:]
+        
+        lines = []
+        texts = []
+        add_text = texts.append
+        components = []
+        add_components = components.append
+        component_count = 0
+        for record in records:
+            if not record:
+                lines.append('')
+                continue
+            fields = iter(record)
+            record_type = next(fields)
+            parts = [record_type]
+            append = parts.append
+            if record_type == 'H' and len(record) > 1:
+                # The delimiter definition is written verbatim, not escaped
+                next(fields)
+                append(delimiter_definition)
+            for field in fields:
+                if type(field) is str:
+                    append(field)
+                    add_text(field)
+                elif field is None:
+                    append('')
+                elif type(field) is list:
+                    try:
+                        text = component_sep.join(['' if item is None else item for item in field])
+                    except TypeError:
+                        # Numbers or nested repeat lists, escaped right away
+                        append(encode_field(field))
+                    else:
+                        append(text)
+                        add_components(text)
+                        component_count += len(field) - 1
+                else:
+                    append(encode_field(field))
+            lines.append(field_sep.join(parts))
+        
+        # Component lists may only hold the separators put between them
+        text = ''.join(components)
+        if (self._needs_escape(''.join(texts)) or text.count(component_sep) != component_count
+                or field_sep in text or self.repeat_sep in text or self.escape_sep in text):
+            lines = [self._encode_escaped(record) for record in records]
+        return record_sep.join(lines)
+    
+    def encode_record(self, record) -> str:
+        """Encode a single record into a string"""
+        return self.encode_records((record,))
+    
+    def encode_field(self, field) -> str:
+        """Encode a single field: None, text, number, component list or repeat list"""
+        if field is None:
+            return ''
+        if isinstance(field, list):
+            component_sep = self.component_sep
+            try:
+                text = component_sep.join(['' if item is None else item for item in field])
+            except TypeError:
+                # Numbers or nested repeat lists
+                return self._encode_list(field)
+            if text.count(component_sep) == len(field) - 1 and not (
+                    self.field_sep in text or self.repeat_sep in text or self.escape_sep in text):
+                return text
+            return self._encode_list(field)
+        if type(field) is not str:
+            field = str(field)
+        return self._escape(field) if self._needs_escape(field) else field
+    
+    def _encode_list(self, field) -> str:
+        for item in field:
+            if isinstance(item, list):
+                return self.repeat_sep.join([self.encode_field(item) for item in field])
+        encode_field = self.encode_field
+        return self.component_sep.join([encode_field(item) for item in field])
+    
+    def _encode_escaped(self, record) -> str:
+        """Encode a record escaping every field, see :meth:`encode_records`"""
+        if not record:
+            return ''
+        parts = [record[0]] + [self.encode_field(field) for field in record[1:]]
+        if record[0] == 'H' and len(parts) > 1:
+            parts[1] = self.delimiters[1:]
+        return self.field_sep.join(parts)
+    
+    def _needs_escape(self, text: str) -> bool:
+        # Substring tests beat a regex character class on short text
+        return (self.field_sep in text or self.component_sep in text
+                or self.repeat_sep in text or self.escape_sep in text)
+    
+    def _escape(self, text: str) -> str:
+        return text.translate(self._escapes)
+
+# delimiters -> RecordEncoder
+_RECORD_ENCODERS = {}
+
+def get_record_encoder(delimiters=DEFAULT_DELIMITERS) -> RecordEncoder:
+    """Return the cached encoder for a delimiter set (str or bytes)"""
+    encoder = _RECORD_ENCODERS.get(delimiters)
+    if encoder is None:
+        encoder = _RECORD_ENCODERS[delimiters] = RecordEncoder(delimiters)
+    return encoder
+
+_UNDECODED = object()
+
+class LazyRecord(Sequence):
+    """
+    ASTM record that keeps its raw bytes and decodes a field the first time
+    it is accessed.
+    
+    Indexing, iteration, ``len()`` and comparison behave like the list
+    returned by :func:`decode_record`; use :meth:`to_list` where a real list
+    is required (e.g. ``json.dumps``).
+    """
+    __slots__ = ('_raw', '_decoder', '_offsets', '_fields')
+    
+    def __init__(self, record: bytes, encoding=ENCODING, decoder=None):
+        self._raw = record
+        self._decoder = decoder or get_record_decoder(DEFAULT_DELIMITERS, encoding)
+        
+        # Position of the separator in front of every field, plus the end
+        field_sep = self._decoder.field_sep
+        offsets = [-1]
+        pos = record.find(field_sep)
+        while pos != -1:
+            offsets.append(pos)
+            pos = record.find(field_sep, pos + 1)
+        offsets.append(len(record))
+        self._offsets = offsets
+        self._fields = [_UNDECODED] * (len(offsets) - 1)
+    
+    @property
+    def raw(self) -> bytes:
+        """Undecoded record bytes"""
+        return self._raw
+    
+    def __len__(self):
+        return len(self._fields)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._fields)))]
+        
+        value = self._fields[index]
+        if value is _UNDECODED:
+            if index < 0:
+                index += len(self._fields)
+            value = self._decode_field(index)
+            self._fields[index] = value
+        return value
+    
+    def __iter__(self):
+        for i in range(len(self._fields)):
+            yield self[i]
+    
+    def __eq__(self, other):
+        if isinstance(other, (list, LazyRecord)):
+            return self.to_list() == list(other)
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return repr(self.to_list())
+    
+    def to_list(self) -> list:
+        """Decode all remaining fields and return them as a plain list"""
+        return self[:]
+    
+    def _decode_field(self, index):
+        item = self._raw[self._offsets[index] + 1:self._offsets[index + 1]]
+        # Special handling for header delimiters
+        if index == 1 and self._raw.startswith(b'H') and len(item) in (3, 4):
+            return [chr(b) for b in item]
+        return self._decoder.decode_field(item)
+
+def checksum_bytes(data) -> bytes:
+    """
+    Calculate the ASTM checksum (sum of bytes modulo 256) without decoding.
+    
+    :param data: Frame bytes from frame number through ETX/ETB (bytes, bytearray or memoryview)
+    :return: Two uppercase hex digits as bytes, e.g. b'3F'
+    """
+    return b'%02X' % (sum(data) & 0xFF)
+
+def _locate_checksum(frame):
+    """Return (end of checksummed span, expected checksum) for a raw frame."""
+    if isinstance(frame, memoryview):
+        frame = frame.tobytes()
+    if not frame.startswith(STX):
+        return -1, None
+    term_pos = frame.rfind(ETX)
+    if term_pos == -1:
+        term_pos = frame.rfind(ETB)
+    if term_pos == -1:
+        return -1, None
+    return term_pos + 1, frame[term_pos + 1:].rstrip(CRLF)
+
+# Frames joined per NumPy pass in verify_frames
+VERIFY_BATCH_SIZE = 4096
+
+def verify_frames(frames) -> list:
+    """
+    Verify the checksums of a whole batch of frames at once.
+    
+    With NumPy installed the byte sums are taken with one ``reduceat`` per
+    batch of :data:`VERIFY_BATCH_SIZE` frames, so only one batch is ever
+    copied; otherwise each frame is summed in Python.
+    
+    :param frames: List of raw frame bytes (STX ... ETX/ETB CS CR LF)
+    :return: List of booleans, one per frame. Malformed frames are invalid,
+             frames without a checksum are accepted like in strip_and_validate_frame
+    """
+    located = [_locate_checksum(frame) for frame in frames]
+    
+    if np is None or not located:
+        return [cs is not None and (not cs or checksum_bytes(memoryview(frame)[1:end]) == cs)
+                for frame, (end, cs) in zip(frames, located)]
+    
+    sums = []
+    for i in range(0, len(frames), VERIFY_BATCH_SIZE):
+        sums.extend(_frame_sums(frames[i:i + VERIFY_BATCH_SIZE], located[i:i + VERIFY_BATCH_SIZE]))
+    
+    results = []
+    for frame_sum, (end, cs) in zip(sums, located):
+        if cs is None:
+            results.append(False)
+        elif not cs:
+            results.append(True)
+        else:
+            results.append(b'%02X' % frame_sum == cs)
+    return results
+
+def _frame_sums(frames, located) -> list:
+    """Byte sums of frame[1:end] for a batch of frames, mod 256"""
+    # The trailing zero keeps every span end a valid reduceat index
+    data = np.frombuffer(b''.join(frames) + b'\x00', dtype=np.uint8)
+    lengths = np.fromiter((len(frame) for frame in frames), dtype=np.int64, count=len(frames))
+    offsets = np.cumsum(lengths) - lengths
+    starts = offsets + 1
+    ends = offsets + np.fromiter((max(end, 1) for end, cs in located), dtype=np.int64, count=len(located))
+    # Sums over [start, end) are at the even positions of the interleaved bounds
+    bounds = np.empty(2 * len(frames), dtype=np.int64)
+    bounds[0::2] = starts
+    bounds[1::2] = ends
+    # An empty frame at the end of the batch starts past the data
+    np.minimum(bounds, len(data) - 1, out=bounds)
+    sums = np.add.reduceat(data, bounds, dtype=np.uint64)[0::2]
+    # reduceat yields data[start] for an empty span
+    sums = np.where(ends > starts, sums, 0)
+    return (sums & 0xFF).tolist()
 
 def strip_and_validate_frame(frame_data):
     """
     Strip STX, ETB/ETX, and validate/remove checksum from a single frame.
     
-    :param frame_data: Raw frame bytes
+    :param frame_data: Raw frame bytes, or a memoryview/bytearray of them
     :return: Tuple of (clean_content, is_valid_checksum, is_final_frame)
     """
+    if isinstance(frame_data, (memoryview, bytearray)):
+        frame_data = bytes(frame_data)
     if not isinstance(frame_data, bytes):
         raise TypeError('bytes expected, got %r' % frame_data)
     
@@ -276,47 +1063,59 @@ def strip_and_validate_frame(frame_data):
     # Validate checksum if present
     is_valid_checksum = True
     if checksum_part:
-        expected_checksum = make_checksum(content_for_checksum.decode()).encode()
+        expected_checksum = checksum_bytes(content_for_checksum)
         is_valid_checksum = checksum_part == expected_checksum
         if not is_valid_checksum:
-            print(f'Checksum mismatch: expected {expected_checksum}, got {checksum_part}')
+            log.warning('Checksum mismatch: expected %s, got %s', expected_checksum, checksum_part)
     
     return content, is_valid_checksum, is_final_frame
 
-def aggregate_frames(frames):
+def collect_frame_bodies(frames):
     """
-    Aggregate multiple frames into a single ASTM message.
+    Strip and validate every frame and join their bodies in one pass.
     
     :param frames: List of frame bytes
-    :return: Complete ASTM message ready for decode()
+    :return: Tuple of (joined record content, all_checksums_valid)
     """
     if not frames:
         raise ValueError('No frames provided')
     
-    aggregated_content = b''
+    bodies = []
     all_valid = True
+    last_index = len(frames) - 1
     
     for i, frame in enumerate(frames):
         content, is_valid, is_final = strip_and_validate_frame(frame)
         
         if not is_valid:
             all_valid = False
-            print(f'Frame {i+1} has invalid checksum')
+            log.warning('Frame %d has invalid checksum', i + 1)
         
         # Remove sequence number (first character if it's a digit)
-        if content and content[:1].isdigit():
+        if content[:1].isdigit():
             content = content[1:]
         
-        aggregated_content += content
+        bodies.append(content)
         
         # Verify the last frame is marked as final
-        if i == len(frames) - 1 and not is_final:
-            print('Warning: Last frame should contain ETX, not ETB')
+        if i == last_index and not is_final:
+            log.warning('Last frame should contain ETX, not ETB')
+    
+    return b''.join(bodies), all_valid
+
+def aggregate_frames(frames):
+    """
+    Aggregate multiple frames into a single ASTM message.
+    
+    :param frames: List of frame bytes
+    :return: Complete ASTM message ready for decode()
+    """
+    aggregated_content, all_valid = collect_frame_bodies(frames)
     
     # Create complete ASTM message
-    complete_message = STX + b'1' + aggregated_content + ETX
-    checksum = make_checksum(b'1' + aggregated_content + ETX).encode()
-    final_message = complete_message + checksum + CRLF
+    frame_for_checksum = b''.join((b'1', aggregated_content, ETX))
+    checksum = checksum_bytes(frame_for_checksum)
+    final_message = b''.join((STX, frame_for_checksum, checksum, CRLF))
     
     return final_message, all_valid
 
@@ -479,40 +1278,7 @@ def decode(data, encoding=ENCODING):
 
 
 # For encoding i.e => host to analyzer
-def build_astm_frames(message: str, chunk_size: int = MAX_FRAME_BODY_SIZE) -> list[bytes]:
-    """Break a full ASTM message into correctly framed ASTM protocol-compliant frames"""
-    frames = []
-    frame_number = 1
-    
-    for i in range(0, len(message), chunk_size):
-        chunk = message[i:i+chunk_size]
-        is_last_frame = (i + chunk_size >= len(message))
-        
-        # Frame structure: STX + frame_number + data + ETX/ETB + checksum + CR + LF
-        frame_body = f"{frame_number}{chunk}"
-        frame_end = ETX.decode() if is_last_frame else ETB.decode()
-        checksum = make_checksum(frame_body + frame_end)
-        
-        framed = (
-            STX +
-            frame_body.encode(ENCODING) +
-            frame_end.encode() +
-            checksum.encode(ENCODING) +
-            CR + LF
-        )
-        frames.append(framed)
-        frame_number = 1 if frame_number == 7 else frame_number + 1
-    
-    return frames
-
-# def frame_message_block(records):
-    """Frame entire message with STX/ETX and CR line endings"""
-    # print(f"Insider records: {records}")
-    message_content = '\r'.join(records)
-    print(f"message_content: {message_content}")
-    return STX + message_content.encode() + ETX + CR + LF
-
-def frame_astm_message(record_groups: list[list[str]]) -> list[bytes]:
+def frame_astm_message(record_groups: list[list[str]]) -> list[memoryview]:
     """Join all records from multiple groups into a single ASTM message and frame it."""
     all_records = []
     for group in record_groups:
@@ -521,240 +1287,209 @@ def frame_astm_message(record_groups: list[list[str]]) -> list[bytes]:
     return build_astm_frames(full_message)
 
 
-# Validate the resulting message records(H, P, O, R, C)
-def validate_header_fields(decoded_data: list) -> bool:
-    """Validate that decoded data has the expected structure for header record"""
-    if not decoded_data or len(decoded_data) == 0:
-        return False
+class RecordIndex:
+    """
+    Positions of the records of each type in decoded data, built in one pass.
     
-    # Look for header record in the data
-    for record in decoded_data:
-        if len(record) > 0 and record[0].startswith('H'):
-            return True
+    The validate_*, find_* and map_*_to_input functions accept an index in
+    place of the decoded list, so a message is scanned once however many
+    record types are looked up.
+    """
     
-    return False
-
-def validate_comment_fields(decoded_data: list) -> bool:
-    """Validate that decoded data has the expected structure for comment record"""
-    if not decoded_data or len(decoded_data) == 0:
-        return False
+    def __init__(self, decoded_data: list):
+        self.records = decoded_data
+        self.positions = {}
+        for i, record in enumerate(decoded_data):
+            if len(record) > 0 and record[0]:
+                self.positions.setdefault(record[0][0], []).append(i)
     
-    # Look for comment record in the data (could be at any position)
-    comment_found = False
-    for record in decoded_data:
-        if len(record) > 0 and record[0].startswith('C'):
-            comment_found = True
-            break
+    def __len__(self):
+        return len(self.records)
     
-    return comment_found
-
-def validate_patient_fields(decoded_data: list) -> bool:
-    """Validate that decoded data has the expected structure for patient record"""
-    if not decoded_data or len(decoded_data) == 0:
-        return False
+    def has(self, record_type: str) -> bool:
+        """True if a record of the type is present"""
+        return record_type in self.positions
     
-    # Look for patient record in the data
-    for record in decoded_data:
-        if len(record) > 0 and record[0].startswith('P'):
-            return True
+    def first(self, record_type: str) -> list:
+        """The first record of the type, or an empty list"""
+        positions = self.positions.get(record_type)
+        return self.records[positions[0]] if positions else []
+    
+    def all(self, record_type: str) -> list:
+        """All records of the type, in message order"""
+        return [self.records[i] for i in self.positions.get(record_type, ())]
     
-    return False
+    def count(self, record_type: str) -> int:
+        """Number of records of the type"""
+        return len(self.positions.get(record_type, ()))
+
+def as_record_index(decoded_data) -> RecordIndex:
+    """Return `decoded_data` as a :class:`RecordIndex`, indexing a list if needed"""
+    if isinstance(decoded_data, RecordIndex):
+        return decoded_data
+    return RecordIndex(decoded_data or [])
+
+# Validate the resulting message records(H, P, O, R, C)
+def validate_header_fields(decoded_data) -> bool:
+    """Validate that decoded data has the expected structure for header record"""
+    return as_record_index(decoded_data).has('H')
 
-def validate_order_fields(decoded_data: list) -> bool:
+def validate_comment_fields(decoded_data) -> bool:
+    """Validate that decoded data has the expected structure for comment record"""
+    # Comment records could be at any position
+    return as_record_index(decoded_data).has('C')
+
+def validate_patient_fields(decoded_data) -> bool:
+    """Validate that decoded data has the expected structure for patient record"""
+    return as_record_index(decoded_data).has('P')
+
+def validate_order_fields(decoded_data) -> bool:
     """Validate that decoded data has the expected structure for order record"""
-    if not decoded_data or len(decoded_data) == 0:
-        return False
-    
-    # Look for order record in the data
-    for record in decoded_data:
-        if len(record) > 0 and record[0].startswith('O'):
-            return True
-    
-    return False
+    return as_record_index(decoded_data).has('O')
 
-def validate_result_fields(decoded_data: list) -> bool:
+def validate_result_fields(decoded_data) -> bool:
     """Validate that decoded data has the expected structure for result record"""
-    if not decoded_data or len(decoded_data) == 0:
-        return False
-    
-    # Look for result record in the data
-    for record in decoded_data:
-        if len(record) > 0 and record[0].startswith('R'):
-            return True
-    
-    return False
+    return as_record_index(decoded_data).has('R')
 
 
 # return the respective record based on the recordType 
-def find_patient_record(decoded_data: list) -> list:
+def find_patient_record(decoded_data) -> list:
     """Find and return the patient record from decoded data"""
-    for record in decoded_data:
-        if len(record) > 0 and record[0].startswith('P'):
-            return record
-        
-    return []
+    return as_record_index(decoded_data).first('P')
 
-def find_order_record(decoded_data: list) -> list:
+def find_order_record(decoded_data) -> list:
     """Find and return the order record from decoded data"""
-    for record in decoded_data:
-        if len(record) > 0 and record[0].startswith('O'):
-            return record
-    return []
+    return as_record_index(decoded_data).first('O')
 
-def find_result_record(decoded_data: list) -> list:
+def find_result_record(decoded_data) -> list:
     """Find and return the result record from decoded data"""
-    for record in decoded_data:
-        if len(record) > 0 and record[0].startswith('R'):
-            return record
-    return []
+    return as_record_index(decoded_data).first('R')
 
-def find_header_record(decoded_data: list) -> list:
+def find_header_record(decoded_data) -> list:
     """Find and return the header record from decoded data"""
-    for record in decoded_data:
-        if len(record) > 0 and record[0].startswith('H'):
-            return record
-    return []
+    return as_record_index(decoded_data).first('H')
 
-def find_comment_record(decoded_data: list) -> list:
+def find_comment_record(decoded_data) -> list:
     """Find and return the comment record from decoded data"""
-    for record in decoded_data:
-        if len(record) > 0 and record[0].startswith('C'):
-            return record
-    return []
+    return as_record_index(decoded_data).first('C')
 
-# Mapping records to the record object we have defined
-def map_header_to_input(inputList: list, headerRecord):
-    """Map decoded ASTM data to header record fields with validation"""
-    if len(inputList) == 0:
-        raise Exception("Input list is empty")
-   
-    if not validate_header_fields(inputList):
-        raise Exception("Invalid header record format")
-   
-    # Find the header record in the data
-    header_data = find_header_record(inputList)
-    if not header_data:
-        raise Exception("Header record not found in decoded data")
+class MappingPlan:
+    """
+    Field names of a record class and a bulk assignment of decoded values.
     
-    field_names = list(headerRecord._data.keys())    
+    Built once per class (see :func:`get_mapping_plan`). Values are assigned
+    by position with a single ``update`` from ``zip``; fields past the end of
+    the decoded record are set to "" as the per-field mapping did.
+    """
     
-    for i, field_name in enumerate(field_names):
-        if i < len(header_data):
-            headerRecord._data[field_name] = header_data[i]
-        else:
-            headerRecord._data[field_name] = ""
+    def __init__(self, record_class):
+        sample = record_class()
+        self.record_class = record_class
+        self.field_names = tuple(sample._data.keys())
+        self._data_type = type(sample._data)
+        self._padding = tuple((name, "") for name in self.field_names)
     
-    return headerRecord
-
-def map_patient_to_input(inputList: list, patientRecord):
-    """Map decoded ASTM data to patient record fields with validation"""
+    def assign(self, astmRecord, values):
+        """Assign decoded values to the fields of a record object"""
+        data = astmRecord._data
+        data.update(zip(self.field_names, values))
+        if len(values) < len(self.field_names):
+            data.update(self._padding[len(values):])
+        return astmRecord
+    
+    def to_data(self, values):
+        """Mapped field data for decoded values, without a record object"""
+        data = self._data_type(zip(self.field_names, values))
+        if len(values) < len(self.field_names):
+            data.update(self._padding[len(values):])
+        return data
+
+# record class -> MappingPlan
+_MAPPING_PLANS = {}
+
+def get_mapping_plan(record_class) -> MappingPlan:
+    """Return the cached mapping plan of a record class"""
+    plan = _MAPPING_PLANS.get(record_class)
+    if plan is None:
+        plan = _MAPPING_PLANS[record_class] = MappingPlan(record_class)
+    return plan
 
-    if len(inputList) == 0:
+# Mapping records to the record object we have defined
+def _map_record_to_input(inputList, record_type: str, name: str, astmRecord):
+    """Map the first record of a type in decoded data to the record object's fields"""
+    index = as_record_index(inputList)
+    if len(index) == 0:
         raise Exception("Input list is empty")
    
-    if not validate_patient_fields(inputList):
-        raise Exception("Invalid patient record format")
+    if not index.has(record_type):
+        raise Exception(f"Invalid {name} record format")
    
-    # Find the patient record in the data
-    patient_data = find_patient_record(inputList)
-    if not patient_data:
-        raise Exception("Patient record not found in decoded data")
+    record_data = index.first(record_type)
+    if not record_data:
+        raise Exception(f"{name.capitalize()} record not found in decoded data")
     
-    field_names = list(patientRecord._data.keys())    
-    
-    for i, field_name in enumerate(field_names):
-        if i < len(patient_data):
-            patientRecord._data[field_name] = patient_data[i]
-        else:
-            patientRecord._data[field_name] = ""
-    
-    return patientRecord
+    return get_mapping_plan(type(astmRecord)).assign(astmRecord, record_data)
+
+def map_header_to_input(inputList, headerRecord):
+    """Map decoded ASTM data to header record fields with validation"""
+    return _map_record_to_input(inputList, 'H', 'header', headerRecord)
+
+def map_patient_to_input(inputList, patientRecord):
+    """Map decoded ASTM data to patient record fields with validation"""
+    return _map_record_to_input(inputList, 'P', 'patient', patientRecord)
 
-def map_order_to_input(inputList: list, orderRecord):
+def map_order_to_input(inputList, orderRecord):
     """Map decoded ASTM data to order record fields with validation"""
-    if len(inputList) == 0:
-        raise Exception("Input list is empty")
-   
-    if not validate_order_fields(inputList):
-        raise Exception("Invalid order record format")
-   
-    # Find the order record in the data
-    order_data = find_order_record(inputList)
-    if not order_data:
-        raise Exception("Order record not found in decoded data")
-    
-    field_names = list(orderRecord._data.keys())    
-    
-    for i, field_name in enumerate(field_names):
-        if i < len(order_data):
-            orderRecord._data[field_name] = order_data[i]
-        else:
-            orderRecord._data[field_name] = ""
-    
-    return orderRecord
+    return _map_record_to_input(inputList, 'O', 'order', orderRecord)
 
-def map_result_to_input(inputList: list, resultRecord):
+def map_result_to_input(inputList, resultRecord):
     """Map decoded ASTM data to result record fields with validation"""
-    if len(inputList) == 0:
-        raise Exception("Input list is empty")
-   
-    if not validate_result_fields(inputList):
-        raise Exception("Invalid result record format")
-   
-    # Find the result record in the data
-    result_data = find_result_record(inputList)
-    if not result_data:
-        raise Exception("Result record not found in decoded data")
-    
-    field_names = list(resultRecord._data.keys())    
-    
-    for i, field_name in enumerate(field_names):
-        if i < len(result_data):
-            resultRecord._data[field_name] = result_data[i]
-        else:
-            resultRecord._data[field_name] = ""
-    
-    return resultRecord
+    return _map_record_to_input(inputList, 'R', 'result', resultRecord)
 
-def map_comment_to_input(inputList: list, commentRecord):
+def map_comment_to_input(inputList, commentRecord):
     """Map decoded ASTM data to comment record fields with validation"""
-    if len(inputList) == 0:
-        raise Exception("Input list is empty")
-   
-    if not validate_comment_fields(inputList):
-        raise Exception("Invalid comment record format")
-   
-    # Find the comment record in the data
-    comment_data = find_comment_record(inputList)
-    if not comment_data:
-        raise Exception("Comment record not found in decoded data")
+    return _map_record_to_input(inputList, 'C', 'comment', commentRecord)
+
+
+class LazyJsonResult(dict):
+    """
+    Parse result whose 'json' entry is serialised on first access.
     
-    field_names = list(commentRecord._data.keys())    
+    Returned by the parse_astm_* functions called with ``lazy_json=True``.
+    Pretty-printing every record is costly and mostly unused, so
+    ``result['json']`` (or ``result.get('json')``) dumps ``result['data']``
+    with indent=2 only when asked and caches it. Until then 'json' is not
+    among the keys, ``len()`` or ``dict(result)``.
+    """
     
-    for i, field_name in enumerate(field_names):
-        if i < len(comment_data):
-            commentRecord._data[field_name] = comment_data[i]
-        else:
-            commentRecord._data[field_name] = ""
+    def __missing__(self, key):
+        if key != 'json' or 'data' not in self:
+            raise KeyError(key)
+        data = self['data']
+        value = self['json'] = PRETTY.dumps(data) if data is not None else None
+        return value
     
-    return commentRecord
+    def get(self, key, default=None):
+        if key == 'json' and 'data' in self:
+            return self[key]
+        return super().get(key, default)
 
+def json_result(data, lazy_json=False, **fields) -> dict:
+    """Parse result with `data` and its pretty-printed 'json', serialised on first access with lazy_json"""
+    if lazy_json:
+        return LazyJsonResult(fields, data=data)
+    return {**fields, 'data': data, 'json': PRETTY.dumps(data) if data is not None else None}
 
 # Parsing specific record line
-def parse_astm_patient(analyzer_output: str) -> dict:
+def parse_astm_patient(analyzer_output: str, lazy_json=False) -> dict:
     """Complete function to parse ASTM patient from analyzer output"""
     try:
         patient = ExtendedPatientRecord()        
         byte_astm = buildAstmMessage(message=analyzer_output)     
         decoded_output_patient = decode(byte_astm)
         mapped_patient = map_patient_to_input(decoded_output_patient, patient)        
-        patient_json = json.dumps(obj=mapped_patient._data, indent=2)        
         
-        return {
-            'success': True,
-            'data': mapped_patient._data,
-            'json': patient_json
-        }
+        return json_result(mapped_patient._data, lazy_json, success=True)
        
     except Exception as e:
         return {
@@ -764,20 +1499,15 @@ def parse_astm_patient(analyzer_output: str) -> dict:
             'json': None
         }
 
-def parse_astm_order(analyzer_output: str) -> dict:
+def parse_astm_order(analyzer_output: str, lazy_json=False) -> dict:
     """Complete function to parse ASTM order from analyzer output"""
     try:
         order = ExtendedOrderRecord()        
         byte_astm = buildAstmMessage(message=analyzer_output)       
         decoded_output_order = decode(byte_astm)
         mapped_order = map_order_to_input(decoded_output_order, order)
-        order_json = json.dumps(obj=mapped_order._data, indent=2)        
         
-        return {
-            'success': True,
-            'data': mapped_order._data,
-            'json': order_json
-        }
+        return json_result(mapped_order._data, lazy_json, success=True)
        
     except Exception as e:
         return {
@@ -787,20 +1517,15 @@ def parse_astm_order(analyzer_output: str) -> dict:
             'json': None
         }
 
-def parse_astm_result(analyzer_output: str) -> dict:
+def parse_astm_result(analyzer_output: str, lazy_json=False) -> dict:
     """Complete function to parse ASTM result from analyzer output"""
     try:
         result = ExtendedResultRecord()        
         byte_astm = buildAstmMessage(message=analyzer_output)    
         decoded_output_result = decode(byte_astm)
         mapped_result = map_result_to_input(decoded_output_result, result)      
-        result_json = json.dumps(obj=mapped_result._data, indent=2)        
         
-        return {
-            'success': True,
-            'data': mapped_result._data,
-            'json': result_json
-        }
+        return json_result(mapped_result._data, lazy_json, success=True)
        
     except Exception as e:
         return {
@@ -810,20 +1535,15 @@ def parse_astm_result(analyzer_output: str) -> dict:
             'json': None
         }
 
-def parse_astm_header(analyzer_output: str) -> dict:
+def parse_astm_header(analyzer_output: str, lazy_json=False) -> dict:
     """Complete function to parse ASTM header from analyzer output"""
     try:
         header = ExtraHeaderFields()        
         byte_astm = buildAstmMessage(message=analyzer_output)   
         decoded_input_header = decode(byte_astm)
         mapped_header = map_header_to_input(decoded_input_header, header)        
-        header_json = json.dumps(obj=mapped_header._data, indent=2)        
         
-        return {
-            'success': True,
-            'data': mapped_header._data,
-            'json': header_json
-        }
+        return json_result(mapped_header._data, lazy_json, success=True)
        
     except Exception as e:
         return {
@@ -833,19 +1553,14 @@ def parse_astm_header(analyzer_output: str) -> dict:
             'json': None
         }
 
-def parse_astm_comment(analyzer_output: str) -> dict:
+def parse_astm_comment(analyzer_output: str, lazy_json=False) -> dict:
     """Complete function to parse ASTM comment from analyzer output"""
     try:
         comment = ExtendedCommentRecord()        
         byte_astm = buildAstmMessage(message=analyzer_output)
         decoded_output_comment = decode(byte_astm)
         mapped_comment = map_comment_to_input(decoded_output_comment, comment)        
-        comment_json = json.dumps(obj=mapped_comment._data, indent=2)                
-        return {
-            'success': True,
-            'data': mapped_comment._data,
-            'json': comment_json
-        }
+        return json_result(mapped_comment._data, lazy_json, success=True)
         
     except Exception as e:
         return {
@@ -857,11 +1572,12 @@ def parse_astm_comment(analyzer_output: str) -> dict:
 
 
 
-def parse_astm_multi_record(analyzer_output: str) -> dict:
+def parse_astm_multi_record(analyzer_output: str, lazy_json=False) -> dict:
     """Parse ASTM output that might contain multiple record types"""
     try:
         byte_astm = buildAstmMessage(message=analyzer_output)
         decoded_data = decode(byte_astm)
+        index = RecordIndex(decoded_data)
 
         results = {
             'success': True,
@@ -878,67 +1594,52 @@ def parse_astm_multi_record(analyzer_output: str) -> dict:
         }
         
         # Parse header if present
-        if validate_header_fields(decoded_data):
+        if validate_header_fields(index):
             try:
                 header = ExtraHeaderFields()
-                mapped_header = map_header_to_input(decoded_data, header)
-                results['records']['header'] = {
-                    'data': mapped_header._data,
-                    'json': json.dumps(mapped_header._data, indent=2)
-                }
+                mapped_header = map_header_to_input(index, header)
+                results['records']['header'] = json_result(mapped_header._data, lazy_json)
                 results['record_count']['header'] = 1
             except Exception as e:
                 results['errors'].append(f"Header parsing error: {str(e)}")
         
         # Parse patient if present
-        if validate_patient_fields(decoded_data):
+        if validate_patient_fields(index):
             try:
                 patient = ExtendedPatientRecord()
-                mapped_patient = map_patient_to_input(decoded_data, patient)
-                results['records']['patient'] = {
-                    'data': mapped_patient._data,
-                    'json': json.dumps(mapped_patient._data, indent=2)
-                }
-                results['record_count']['patient'] = len(find_all_records_by_type(decoded_data, 'P'))
+                mapped_patient = map_patient_to_input(index, patient)
+                results['records']['patient'] = json_result(mapped_patient._data, lazy_json)
+                results['record_count']['patient'] = index.count('P')
             except Exception as e:
                 results['errors'].append(f"Patient parsing error: {str(e)}")
         
         # Parse order if present
-        if validate_order_fields(decoded_data):
+        if validate_order_fields(index):
             try:
                 order = ExtendedOrderRecord()
-                mapped_order = map_order_to_input(decoded_data, order)
-                results['records']['order'] = {
-                    'data': mapped_order._data,
-                    'json': json.dumps(mapped_order._data, indent=2)
-                }
-                results['record_count']['order'] = len(find_all_records_by_type(decoded_data, 'O'))
+                mapped_order = map_order_to_input(index, order)
+                results['records']['order'] = json_result(mapped_order._data, lazy_json)
+                results['record_count']['order'] = index.count('O')
             except Exception as e:
                 results['errors'].append(f"Order parsing error: {str(e)}")
         
         # Parse result if present
-        if validate_result_fields(decoded_data):
+        if validate_result_fields(index):
             try:
                 result = ExtendedResultRecord()
-                mapped_result = map_result_to_input(decoded_data, result)
-                results['records']['result'] = {
-                    'data': mapped_result._data,
-                    'json': json.dumps(mapped_result._data, indent=2)
-                }
-                results['record_count']['result'] = len(find_all_records_by_type(decoded_data, 'R'))
+                mapped_result = map_result_to_input(index, result)
+                results['records']['result'] = json_result(mapped_result._data, lazy_json)
+                results['record_count']['result'] = index.count('R')
             except Exception as e:
                 results['errors'].append(f"Result parsing error: {str(e)}")
         
         # Parse comment if present
-        if validate_comment_fields(decoded_data):
+        if validate_comment_fields(index):
             try:
                 comment = ExtendedCommentRecord()
-                mapped_comment = map_comment_to_input(decoded_data, comment)
-                results['records']['comment'] = {
-                    'data': mapped_comment._data,
-                    'json': json.dumps(mapped_comment._data, indent=2)
-                }
-                results['record_count']['comment'] = len(find_all_records_by_type(decoded_data, 'C'))
+                mapped_comment = map_comment_to_input(index, comment)
+                results['records']['comment'] = json_result(mapped_comment._data, lazy_json)
+                results['record_count']['comment'] = index.count('C')
             except Exception as e:
                 results['errors'].append(f"Comment parsing error: {str(e)}")
         
@@ -953,7 +1654,16 @@ def parse_astm_multi_record(analyzer_output: str) -> dict:
             'record_count': {}
         }
 
-def parse_astm_complete_transmission(analyzer_output: str) -> dict:
+# Record type -> (record class, key in the parse_astm_complete_transmission records)
+TRANSMISSION_RECORDS = {
+    'H': (ExtraHeaderFields, 'headers'),
+    'P': (ExtendedPatientRecord, 'patients'),
+    'O': (ExtendedOrderRecord, 'orders'),
+    'R': (ExtendedResultRecord, 'results'),
+    'C': (ExtendedCommentRecord, 'comments'),
+}
+
+def parse_astm_complete_transmission(analyzer_output: str, lazy_json=False) -> dict:
     """Parse complete ASTM transmission with multiple records of same type"""
     try:
         byte_astm = buildAstmMessage(message=analyzer_output)        
@@ -983,76 +1693,10 @@ def parse_astm_complete_transmission(analyzer_output: str) -> dict:
             record_type = record[0][0]  # First character of first field
             
             try:
-                if record_type == 'H':
-                    header = ExtraHeaderFields()
-                    # Map this specific record
-                    field_names = list(header._data.keys())
-                    for i, field_name in enumerate(field_names):
-                        if i < len(record):
-                            header._data[field_name] = record[i]
-                        else:
-                            header._data[field_name] = ""
-                    
-                    results['records']['headers'].append({
-                        'data': header._data,
-                        'json': json.dumps(header._data, indent=2)
-                    })
-                    
-                elif record_type == 'P':
-                    patient = ExtendedPatientRecord()
-                    field_names = list(patient._data.keys())
-                    for i, field_name in enumerate(field_names):
-                        if i < len(record):
-                            patient._data[field_name] = record[i]
-                        else:
-                            patient._data[field_name] = ""
-                    
-                    results['records']['patients'].append({
-                        'data': patient._data,
-                        'json': json.dumps(patient._data, indent=2)
-                    })
-                    
-                elif record_type == 'O':
-                    order = ExtendedOrderRecord()
-                    field_names = list(order._data.keys())
-                    for i, field_name in enumerate(field_names):
-                        if i < len(record):
-                            order._data[field_name] = record[i]
-                        else:
-                            order._data[field_name] = ""
-                    
-                    results['records']['orders'].append({
-                        'data': order._data,
-                        'json': json.dumps(order._data, indent=2)
-                    })
-                    
-                elif record_type == 'R':
-                    result_record = ExtendedResultRecord()
-                    field_names = list(result_record._data.keys())
-                    for i, field_name in enumerate(field_names):
-                        if i < len(record):
-                            result_record._data[field_name] = record[i]
-                        else:
-                            result_record._data[field_name] = ""
-                    
-                    results['records']['results'].append({
-                        'data': result_record._data,
-                        'json': json.dumps(result_record._data, indent=2)
-                    })
-                    
-                elif record_type == 'C':
-                    comment = ExtendedCommentRecord()
-                    field_names = list(comment._data.keys())
-                    for i, field_name in enumerate(field_names):
-                        if i < len(record):
-                            comment._data[field_name] = record[i]
-                        else:
-                            comment._data[field_name] = ""
-                    
-                    results['records']['comments'].append({
-                        'data': comment._data,
-                        'json': json.dumps(comment._data, indent=2)
-                    })
+                if record_type in TRANSMISSION_RECORDS:
+                    record_class, key = TRANSMISSION_RECORDS[record_type]
+                    data = get_mapping_plan(record_class).to_data(record)
+                    results['records'][key].append(json_result(data, lazy_json))
                     
             except Exception as e:
                 results['errors'].append(f"Error parsing {record_type} record: {str(e)}")
@@ -1073,8 +1717,13 @@ def parse_astm_complete_transmission(analyzer_output: str) -> dict:
             'summary': {}
         }
 
-def find_all_records_by_type(decoded_data: list, record_type: str) -> list:
+def find_all_records_by_type(decoded_data, record_type: str) -> list:
     """Find all records of a specific type from decoded data"""
+    if len(record_type) == 1:
+        return as_record_index(decoded_data).all(record_type)
+    
+    if isinstance(decoded_data, RecordIndex):
+        decoded_data = decoded_data.records
     matching_records = []
     for record in decoded_data:
         if len(record) > 0 and record[0].startswith(record_type):
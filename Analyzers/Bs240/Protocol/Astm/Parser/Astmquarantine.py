@@ -0,0 +1,56 @@
+from collections import deque, namedtuple
+
+DEFAULT_QUARANTINE_SIZE = 256
+# Longest slice of a rejected frame that is kept for inspection
+MAX_QUARANTINED_BYTES = 1024
+
+QuarantinedFrame = namedtuple('QuarantinedFrame', ['offset', 'reason', 'data'])
+
+class FrameQuarantine:
+    """
+    Bounded store of frames rejected while decoding, with decode counters.
+
+    Only the most recent `maxlen` entries are kept and each entry holds at
+    most `max_bytes` of the offending data, so a noisy line cannot grow it
+    without bound. Counters keep counting after old entries are evicted.
+    """
+
+    def __init__(self, maxlen=DEFAULT_QUARANTINE_SIZE, max_bytes=MAX_QUARANTINED_BYTES):
+        self.entries = deque(maxlen=maxlen)
+        self.max_bytes = max_bytes
+        self.counters = {
+            'frames_accepted': 0,
+            'frames_rejected': 0,
+            'records_decoded': 0,
+            'records_rejected': 0,
+            'bytes_quarantined': 0,
+        }
+        self.reasons = {}
+
+    def add(self, offset: int, reason: str, data: bytes, kind: str = 'frames'):
+        """
+        Quarantine rejected data.
+
+        :param offset: Stream offset of the first rejected byte
+        :param reason: Short reason, e.g. 'checksum' or 'truncated'
+        :param data: Rejected bytes
+        :param kind: 'frames' or 'records', selects the rejection counter
+        """
+        self.entries.append(QuarantinedFrame(offset, reason, bytes(data[:self.max_bytes])))
+        self.counters[kind + '_rejected'] += 1
+        self.counters['bytes_quarantined'] += len(data)
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def clear(self):
+        """Drop the quarantined entries, counters are kept"""
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        """Counters plus rejections per reason"""
+        return dict(self.counters, reasons=dict(self.reasons), quarantined=len(self.entries))
@@ -0,0 +1,203 @@
+from astm.constants import ENCODING, STX, ETX, ETB, CR, LF, RECORD_SEP
+from logging import getLogger
+from .Astmparser import decode_record, checksum_bytes, Projection, DelimiterState
+from .Astmquarantine import FrameQuarantine
+
+log = getLogger(__name__)
+
+class AstmStreamDecoder:
+    """
+    Incremental ASTM decoder for data arriving in arbitrary chunks.
+
+    Records are decoded as soon as the frame that completes them arrives.
+    Between calls only the unfinished tail frame and the partial record
+    carried over an intermediate (ETB) frame are kept in memory.
+
+    In recovery mode (``recover=True``) frames failing their checksum and
+    records failing to decode are moved to :attr:`quarantine` instead of
+    being decoded or stopping the stream, and decoding resumes at the next
+    STX. A partial record is only continued by the frame that follows it
+    in sequence, so a retransmitted frame still completes it.
+    """
+
+    def __init__(self, encoding=ENCODING, lazy=False, analyzer=None, recover=False, quarantine=None,
+                 projection=None):
+        self.encoding = encoding
+        self.lazy = lazy
+        self.analyzer = analyzer
+        self.projection = Projection(projection) if projection is not None else None
+        self.recover = recover
+        self.quarantine = quarantine if quarantine is not None else FrameQuarantine()
+        # Delimiters declared by the current transmission's H record
+        self.delimiters = DelimiterState(encoding, analyzer)
+        self._buffer = bytearray()
+        self._offset = 0
+        self._scan_from = 0
+        self._pending = b''
+        self._last_fn = None
+        self._resync = False
+
+    @property
+    def has_partial_frame(self) -> bool:
+        """True if a started frame is still waiting for its terminator"""
+        return STX[0] in self._buffer
+
+    @property
+    def counters(self) -> dict:
+        """Frame and record counters of the quarantine"""
+        return self.quarantine.counters
+
+    def reset(self, transmission=True):
+        """
+        Drop any buffered bytes, e.g. on ENQ/EOT or a broken link.
+
+        :param transmission: Also forget the delimiters declared by the
+                             transmission's H record; False when only a
+                             broken frame is dropped mid-transmission
+        """
+        self._offset += len(self._buffer)
+        self._buffer.clear()
+        self._scan_from = 0
+        self._pending = b''
+        self._last_fn = None
+        self._resync = False
+        if transmission:
+            self.delimiters.reset()
+
+    def feed(self, data: bytes):
+        """
+        Feed received bytes and yield every record completed by them.
+
+        :param data: Raw bytes as read from the link (any chunk size)
+        :return: Generator of decoded records
+        """
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            raise TypeError('bytes expected, got %r' % type(data))
+
+        counters = self.quarantine.counters
+        self._buffer += data
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                return
+            offset, body, is_final = frame
+            for record in self._split_records(offset, body, is_final):
+                if self.recover:
+                    try:
+                        decoded = decode_record(record, self.encoding, self.lazy, self.analyzer,
+                                                self.projection, self.delimiters)
+                    except Exception as e:
+                        self.quarantine.add(offset, f'decode error: {e}', record, 'records')
+                        continue
+                else:
+                    decoded = decode_record(record, self.encoding, self.lazy, self.analyzer, self.projection,
+                                            self.delimiters)
+                counters['records_decoded'] += 1
+                yield decoded
+
+    def _discard(self, count: int):
+        """Drop `count` bytes from the front of the buffer"""
+        del self._buffer[:count]
+        self._offset += count
+        self._scan_from = max(self._scan_from - count, 0)
+
+    def _next_frame(self):
+        """Cut the next valid frame off the buffer, or return None"""
+        buffer = self._buffer
+
+        while True:
+            start = buffer.find(STX)
+            if start == -1:
+                # Only link control characters or trailer leftovers (ENQ, CRLF...)
+                self._discard(len(buffer))
+                return None
+            if start:
+                self._discard(start)
+
+            # Resume the terminator search where the previous call stopped
+            scan_from = max(self._scan_from, 1)
+            etx_pos = buffer.find(ETX, scan_from)
+            etb_pos = buffer.find(ETB, scan_from)
+            if etx_pos == -1 or (etb_pos != -1 and etb_pos < etx_pos):
+                term_pos = etb_pos
+            else:
+                term_pos = etx_pos
+
+            if term_pos == -1 or len(buffer) < term_pos + 3:
+                self._scan_from = len(buffer) if term_pos == -1 else term_pos
+                return None
+
+            restart = buffer.find(STX, 1, term_pos)
+            if restart != -1:
+                # A new frame started before this one was terminated;
+                # resynchronise on it right away
+                if not self.recover:
+                    log.warning('Dropping truncated frame %r', bytes(buffer[:restart]))
+                self.quarantine.add(self._offset, 'truncated', buffer[:restart])
+                self._discard(restart)
+                continue
+
+            frame_end = term_pos + 3
+            if buffer[frame_end:frame_end + 1] == CR:
+                frame_end += 1
+            if buffer[frame_end:frame_end + 1] == LF:
+                frame_end += 1
+
+            offset = self._offset
+            frame_for_checksum = bytes(buffer[1:term_pos + 1])
+            cs = bytes(buffer[term_pos + 1:term_pos + 3])
+
+            ccs = checksum_bytes(frame_for_checksum)
+            if cs != ccs:
+                if self.recover:
+                    self.quarantine.add(offset, 'checksum', buffer[:frame_end])
+                    self._discard(frame_end)
+                    continue
+                log.warning('Checksum failure: expected %s, calculated %s', ccs, cs)
+
+            self._discard(frame_end)
+            self.quarantine.counters['frames_accepted'] += 1
+
+            body = frame_for_checksum[:-1]
+            is_final = frame_for_checksum[-1:] == ETX
+            if body[:1].isdigit():
+                if self.recover:
+                    self._check_sequence(offset, body[0] - 48, is_final)
+                body = body[1:]
+            return offset, body, is_final
+
+    def _check_sequence(self, offset: int, fn: int, is_final: bool):
+        """Drop a carried-over record when the frame continuing it was lost"""
+        last_fn = self._last_fn
+        if last_fn is not None and fn != (last_fn + 1) % 8 and not (last_fn == 7 and fn == 1):
+            if self._pending:
+                self.quarantine.add(offset, 'lost frame', self._pending, 'records')
+                self._pending = b''
+            # This frame most likely opens with the tail of a record that
+            # started in the lost frame
+            self._resync = True
+        self._last_fn = None if is_final else fn
+
+    def _split_records(self, offset: int, body: bytes, is_final: bool) -> list:
+        """Join the frame body to the carried-over record and split it"""
+        if self._resync:
+            # Skip up to the first record separator after a lost frame
+            cut = body.find(RECORD_SEP)
+            if cut == -1:
+                self.quarantine.add(offset, 'lost frame', body, 'records')
+                if is_final:
+                    self._resync = False
+                return []
+            if cut:
+                self.quarantine.add(offset, 'lost frame', body[:cut], 'records')
+            body = body[cut + 1:]
+            self._resync = False
+        if self._pending:
+            body = self._pending + body
+        records = body.split(RECORD_SEP)
+        if is_final:
+            self._pending = b''
+        else:
+            # The last piece may be continued by the next frame
+            self._pending = records.pop()
+        return [record for record in records if record]
@@ -0,0 +1,119 @@
+from astm.constants import ENCODING, RECORD_SEP
+from datetime import datetime
+from config import ANALYZER_CONFIG_PATH, MAX_FRAME_BODY_SIZE
+from .Astmparser import make_frame, DEFAULT_DELIMITERS
+import json
+
+# H record positions of the fields an analyzer entry may configure
+HEADER_FIELDS = {
+    'message_id': 2,
+    'password': 3,
+    'sender': 4,
+    'address': 5,
+    'reserved': 6,
+    'phone': 7,
+    'caps': 8,
+    'receiver': 9,
+    'comments': 10,
+    'processing_id': 11,
+    'version': 12,
+}
+TIMESTAMP_FORMAT = '%Y%m%d%H%M%S'
+TIMESTAMP_SIZE = 14
+
+_TEMPLATES = {}
+
+class MessageTemplate:
+    """
+    Pre-encoded header and terminator records of one analyzer.
+
+    Only the timestamp of an outbound H record changes between messages,
+    so the static part is encoded once and its byte sum is kept as a
+    partial checksum. Building a header is then a concatenation, and
+    framing a message only sums the bytes in between.
+    """
+
+    def __init__(self, header=None, terminator='L|1|N', encoding=ENCODING):
+        """
+        :param header: Field name -> raw ASTM text, see :data:`HEADER_FIELDS`
+        :param terminator: Terminator record text
+        """
+        fields = ['H', DEFAULT_DELIMITERS[1:].decode()] + [''] * (len(HEADER_FIELDS) + 1)
+        for name, value in (header or {}).items():
+            if name not in HEADER_FIELDS:
+                raise ValueError(f"Unknown header field '{name}'")
+            fields[HEADER_FIELDS[name]] = value or ''
+
+        prefix = (DEFAULT_DELIMITERS[:1].decode().join(fields)).encode(encoding)
+        self._prefix = prefix
+        self._static_sum = sum(prefix) + sum(RECORD_SEP)
+        self.terminator = terminator.encode(encoding) + RECORD_SEP
+        self.terminator_sum = sum(self.terminator)
+
+    def header(self, timestamp=None) -> bytes:
+        """Encoded H record (CR terminated) carrying `timestamp`, default now"""
+        return self._splice(self._timestamp(timestamp))
+
+    def header_sum(self, timestamp=None) -> int:
+        """Byte sum of :meth:`header` for the checksum"""
+        return self._static_sum + sum(self._timestamp(timestamp))
+
+    def iter_frames(self, body: bytes, timestamp=None, chunk_size=MAX_FRAME_BODY_SIZE):
+        """
+        Yield the frames of header + `body` + terminator.
+
+        :param body: Encoded, CR terminated records between H and L
+        """
+        stamp = self._timestamp(timestamp)
+        header = self._splice(stamp)
+        data = header + body + self.terminator
+        head = len(header)
+        tail = len(data) - len(self.terminator)
+        total = len(data)
+        head_sum = self._static_sum + sum(stamp)
+
+        frame_number = 1
+        for start in range(0, total, chunk_size):
+            end = min(start + chunk_size, total)
+            # Sum only the body bytes, the templates' sums are known
+            body_sum = sum(data[max(start, head):min(end, tail)])
+            if start == 0 and end >= head:
+                body_sum += head_sum
+            elif start < head:
+                body_sum += sum(data[start:min(end, head)])
+            if end == total and start <= tail:
+                body_sum += self.terminator_sum
+            elif end > tail:
+                body_sum += sum(data[max(start, tail):end])
+            yield make_frame(frame_number, data[start:end], end == total, body_sum)
+            frame_number = 1 if frame_number == 7 else frame_number + 1
+
+    def _timestamp(self, timestamp) -> bytes:
+        if timestamp is None:
+            timestamp = datetime.now()
+        if isinstance(timestamp, datetime):
+            return timestamp.strftime(TIMESTAMP_FORMAT).encode()
+        if isinstance(timestamp, str):
+            timestamp = timestamp.encode()
+        if len(timestamp) != TIMESTAMP_SIZE:
+            raise ValueError(f"Timestamp must be {TIMESTAMP_SIZE} characters, got {timestamp!r}")
+        return timestamp
+
+    def _splice(self, stamp: bytes) -> bytes:
+        # A new object per call, templates are shared between threads
+        return self._prefix + stamp + RECORD_SEP
+
+def load_templates(path=ANALYZER_CONFIG_PATH) -> dict:
+    """Build the templates of every analyzer entry in AnalyzerConfig.json"""
+    with open(path, encoding='utf-8') as f:
+        analyzers = json.load(f)
+    return {
+        name: MessageTemplate(entry.get('header'), entry.get('terminator', 'L|1|N'))
+        for name, entry in analyzers.items()
+    }
+
+def get_template(analyzer: str, path=ANALYZER_CONFIG_PATH) -> MessageTemplate:
+    """Cached template of an analyzer, configuration is read on first use"""
+    if analyzer not in _TEMPLATES:
+        _TEMPLATES.update(load_templates(path))
+    return _TEMPLATES[analyzer]
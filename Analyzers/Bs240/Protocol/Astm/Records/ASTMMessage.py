@@ -1,3 +1,12 @@
+from ..Parser.Astmparser import LazyRecord, make_frame, get_record_encoder
+from astm.constants import ENCODING
+from config import MAX_FRAME_BODY_SIZE
+from .Serializer import get_serializer
+from .ResultColumns import ResultColumns
+
+# Decoded records arrive either as plain lists or as lazy record views
+RECORD_TYPES = (list, LazyRecord)
+
 class LISMessage:
     """
     A class to handle LIS (Laboratory Information System) messages
@@ -14,42 +23,42 @@ class LISMessage:
         
     def set_header(self, header_data):
         """Set the header record (single record)"""
-        if isinstance(header_data, list) and len(header_data) > 0 and header_data[0] == 'H':
+        if isinstance(header_data, RECORD_TYPES) and len(header_data) > 0 and header_data[0] == 'H':
             self.header = header_data
         else:
             raise ValueError("Header must be a list starting with 'H'")
     
     def add_patient(self, patient_data):
         """Add a patient record"""
-        if isinstance(patient_data, list) and len(patient_data) > 0 and patient_data[0] == 'P':
+        if isinstance(patient_data, RECORD_TYPES) and len(patient_data) > 0 and patient_data[0] == 'P':
             self.patients.append(patient_data)
         else:
             raise ValueError("Patient record must be a list starting with 'P'")
     
     def add_order(self, order_data):
         """Add an order record"""
-        if isinstance(order_data, list) and len(order_data) > 0 and order_data[0] == 'O':
+        if isinstance(order_data, RECORD_TYPES) and len(order_data) > 0 and order_data[0] == 'O':
             self.orders.append(order_data)
         else:
             raise ValueError("Order record must be a list starting with 'O'")
     
     def add_result(self, result_data):
         """Add a result record"""
-        if isinstance(result_data, list) and len(result_data) > 0 and result_data[0] == 'R':
+        if isinstance(result_data, RECORD_TYPES) and len(result_data) > 0 and result_data[0] == 'R':
             self.results.append(result_data)
         else:
             raise ValueError("Result record must be a list starting with 'R'")
     
     def add_comment(self, comment_data):
         """Add a comment record"""
-        if isinstance(comment_data, list) and len(comment_data) > 0 and comment_data[0] == 'C':
+        if isinstance(comment_data, RECORD_TYPES) and len(comment_data) > 0 and comment_data[0] == 'C':
             self.comments.append(comment_data)
         else:
             raise ValueError("Comment record must be a list starting with 'C'")
     
     def set_terminator(self, terminator_data):
         """Set the terminator record (single record)"""
-        if isinstance(terminator_data, list) and len(terminator_data) > 0 and terminator_data[0] == 'L':
+        if isinstance(terminator_data, RECORD_TYPES) and len(terminator_data) > 0 and terminator_data[0] == 'L':
             self.terminator = terminator_data
         else:
             raise ValueError("Terminator must be a list starting with 'L'")
@@ -58,66 +67,21 @@ class LISMessage:
         """
         Encode a field that can be a string, None, or list of components
         """
-        if field is None:
-            return ''
-        elif isinstance(field, str):
-            return field
-        elif isinstance(field, list):
-            # Handle component separation
-            encoded_components = []
-            for component in field:
-                if component is None:
-                    encoded_components.append('')
-                else:
-                    encoded_components.append(str(component))
-            return component_separator.join(encoded_components)
-        else:
-            return str(field)
+        return get_record_encoder('|' + repeat_separator + component_separator + '&').encode_field(field)
     
     def _encode_record(self, record, field_separator='|', component_separator='^', repeat_separator='\\'):
         """
         Encode a single record (list) into a string
         """
-        if not record:
-            return ''
-        
-        encoded_fields = []
-        for field in record:
-            encoded_fields.append(self._encode_field(field, component_separator, repeat_separator))
-        
-        return field_separator.join(encoded_fields)
+        encoder = get_record_encoder(field_separator + repeat_separator + component_separator + '&')
+        return encoder.encode_record(record)
     
     def encode_to_string(self, field_separator='|', component_separator='^', repeat_separator='\\', record_separator='\r'):
         """
         Encode the entire LIS message to a string format
         """
-        encoded_records = []
-        
-        # Encode header
-        if self.header:
-            encoded_records.append(self._encode_record(self.header, field_separator, component_separator, repeat_separator))
-        
-        # Encode patients
-        for patient in self.patients:
-            encoded_records.append(self._encode_record(patient, field_separator, component_separator, repeat_separator))
-        
-        # Encode orders
-        for order in self.orders:
-            encoded_records.append(self._encode_record(order, field_separator, component_separator, repeat_separator))
-        
-        # Encode results
-        for result in self.results:
-            encoded_records.append(self._encode_record(result, field_separator, component_separator, repeat_separator))
-        
-        # Encode comments
-        for comment in self.comments:
-            encoded_records.append(self._encode_record(comment, field_separator, component_separator, repeat_separator))
-        
-        # Encode terminator
-        if self.terminator:
-            encoded_records.append(self._encode_record(self.terminator, field_separator, component_separator, repeat_separator))
-        
-        return record_separator.join(encoded_records)
+        encoder = get_record_encoder(field_separator + repeat_separator + component_separator + '&')
+        return encoder.encode_records(self._iter_records(), record_separator)
     
     def encode_to_bytes(self, field_separator='|', component_separator='^', repeat_separator='\\', record_separator='\r'):
         """
@@ -171,6 +135,56 @@ class LISMessage:
             message_bytes = self.encode_to_bytes()
             return stx + message_bytes + etx + cr + lf
     
+    def iter_frames(self, chunk_size=MAX_FRAME_BODY_SIZE, encoding=ENCODING, template=None, timestamp=None):
+        """
+        Yield the message as ready-to-send ASTM frames.
+        
+        Records are encoded one at a time and cut into frames of at most
+        `chunk_size` body bytes with frame numbers cycling 1 to 7, so only
+        about one frame of encoded data is held at any time and the first
+        frame is available before the rest of the message is encoded.
+        
+        :param template: Analyzer :class:`MessageTemplate` supplying the
+                         pre-encoded H and L records instead of this message's
+        :param timestamp: Header timestamp when a template is used
+        """
+        pending = bytearray()
+        frame_number = 1
+        for data in self._iter_encoded(encoding, template, timestamp):
+            pending += data
+            # Keep the tail back, the last frame must be the ETX one
+            while len(pending) > chunk_size:
+                yield make_frame(frame_number, bytes(pending[:chunk_size]), False)
+                del pending[:chunk_size]
+                frame_number = 1 if frame_number == 7 else frame_number + 1
+        if pending:
+            yield make_frame(frame_number, bytes(pending), True)
+    
+    def _iter_encoded(self, encoding=ENCODING, template=None, timestamp=None):
+        """Yield the encoded, CR terminated records one at a time"""
+        encode_record = get_record_encoder().encode_record
+        if template is not None:
+            yield template.header(timestamp)
+        for record in self._iter_records(template is None):
+            yield (encode_record(record) + '\r').encode(encoding)
+        if template is not None:
+            yield template.terminator
+    
+    def _iter_records(self, envelope=True):
+        """
+        Iterate over all records in transmission order
+        
+        :param envelope: Include the header and terminator records
+        """
+        if envelope and self.header:
+            yield self.header
+        yield from self.patients
+        yield from self.orders
+        yield from self.results
+        yield from self.comments
+        if envelope and self.terminator:
+            yield self.terminator
+    
     def get_all_records(self):
         """Get all records as a list"""
         all_records = []
@@ -184,6 +198,10 @@ class LISMessage:
             all_records.append(self.terminator)
         return all_records
     
+    def result_columns(self):
+        """Results as a columnar :class:`ResultColumns` store"""
+        return ResultColumns(self.results)
+    
     def create_lis_obj(self, decoded_records):
         for record in decoded_records:
             if not record or len(record) == 0:
@@ -325,12 +343,37 @@ class LISMessage:
             
         return lis_msg
     
+    def _json_payload(self):
+        """The :meth:`to_dict` layout referencing the records instead of copying them"""
+        return {
+            "message_type": "LIS",
+            "header": self.header,
+            "patients": self.patients,
+            "orders": self.orders,
+            "results": self.results,
+            "comments": self.comments,
+            "terminator": self.terminator,
+            "record_counts": {
+                "patients": len(self.patients),
+                "orders": len(self.orders),
+                "results": len(self.results),
+                "comments": len(self.comments)
+            }
+        }
+    
     def to_json(self, indent=2):
         """
         Convert LISMessage to JSON string
+        
+        :param indent: Indent width, None for compact output
         """
-        import json
-        return json.dumps(self.to_dict(), indent=indent)
+        return get_serializer(indent).dumps(self._json_payload())
+    
+    def to_json_bytes(self, indent=None):
+        """
+        Convert LISMessage to UTF-8 JSON bytes, compact by default, for forwarding
+        """
+        return get_serializer(indent).dumps_bytes(self._json_payload())
     
     @classmethod
     def from_json(cls, json_string):
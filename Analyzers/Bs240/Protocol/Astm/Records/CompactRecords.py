@@ -0,0 +1,101 @@
+from astm.records import TerminatorRecord
+from keyword import iskeyword
+from .HeaderRecord import ExtraHeaderFields
+from .PatientRecord import ExtendedPatientRecord
+from .OrderRecord import ExtendedOrderRecord
+from .ResultRecord import ExtendedResultRecord
+from .CommentRecord import ExtendedCommentRecord
+
+class CompactRecord:
+    """
+    Base of the generated ``__slots__`` record types.
+
+    Fields are plain slots in the order of the astm record class, filled by
+    position from the decoded values; nothing is converted on the way in.
+    Values past the last field (the BS-240 sends one more R field than the
+    astm class has) are kept in ``_extra``. Records iterate, index and
+    compare like the decoded lists they came from.
+    """
+    __slots__ = ('_extra',)
+    _fields = ()
+
+    def __iter__(self):
+        for name in self._fields:
+            yield getattr(self, name)
+        yield from self._extra
+
+    def __len__(self):
+        return len(self._fields) + len(self._extra)
+
+    def __getitem__(self, index):
+        if isinstance(index, int) and 0 <= index < len(self._fields):
+            return getattr(self, self._fields[index])
+        return list(self)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (CompactRecord, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)
+        if self._extra:
+            values += f', _extra={self._extra!r}'
+        return f'{type(self).__name__}({values})'
+
+    def to_astm(self) -> list:
+        """Field values as a record list"""
+        return list(self)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self._fields}
+
+def record_field_names(record_class) -> tuple:
+    """Field names of an astm record class, in record order"""
+    return tuple(record_class()._data.keys())
+
+def compact_record_class(record_class, name=None):
+    """
+    Generate a ``__slots__`` record type with the fields of an astm record class.
+
+    The constructor is positional like the astm one and fields not given are
+    None. Unlike the astm constructor, which rejects values past the last
+    field, it keeps them in ``_extra``.
+    """
+    fields = record_field_names(record_class)
+    for field in fields:
+        if not field.isidentifier() or iskeyword(field):
+            raise ValueError(f"Field name '{field}' of {record_class.__name__} is not an identifier")
+
+    args = ''.join(f', {field}=None' for field in fields)
+    body = ''.join(f'\n    self.{field} = {field}' for field in fields)
+    namespace = {}
+    exec(f'def __init__(self{args}, *_extra):{body}\n    self._extra = _extra', namespace)
+
+    name = name or 'Compact' + record_class.__name__
+    return type(name, (CompactRecord,), {
+        '__slots__': fields,
+        '__init__': namespace['__init__'],
+        '_fields': fields,
+        'record_class': record_class,
+        '__module__': __name__,
+    })
+
+CompactHeaderRecord = compact_record_class(ExtraHeaderFields, 'CompactHeaderRecord')
+CompactPatientRecord = compact_record_class(ExtendedPatientRecord, 'CompactPatientRecord')
+CompactOrderRecord = compact_record_class(ExtendedOrderRecord, 'CompactOrderRecord')
+CompactResultRecord = compact_record_class(ExtendedResultRecord, 'CompactResultRecord')
+CompactCommentRecord = compact_record_class(ExtendedCommentRecord, 'CompactCommentRecord')
+CompactTerminatorRecord = compact_record_class(TerminatorRecord, 'CompactTerminatorRecord')
+
+# Record type -> compact wrapper, shaped like the dispatcher's wrappers
+COMPACT_WRAPPERS = {
+    'H': CompactHeaderRecord,
+    'P': CompactPatientRecord,
+    'O': CompactOrderRecord,
+    'R': CompactResultRecord,
+    'C': CompactCommentRecord,
+    'L': CompactTerminatorRecord,
+}
@@ -0,0 +1,139 @@
+class PatientNode:
+    """A P record with its orders and comments"""
+    __slots__ = ('record', 'orders', 'comments')
+
+    def __init__(self, record):
+        self.record = record
+        self.orders = []
+        self.comments = []
+
+    def __repr__(self):
+        return f"PatientNode(orders={len(self.orders)}, comments={len(self.comments)})"
+
+class OrderNode:
+    """An O record with its patient, results and comments"""
+    __slots__ = ('record', 'patient', 'results', 'comments')
+
+    def __init__(self, record, patient):
+        self.record = record
+        self.patient = patient
+        self.results = []
+        self.comments = []
+
+    @property
+    def sample_id(self):
+        """Specimen ID of the order (field 2), first component if composite"""
+        return sample_key(self.record[2]) if self.record is not None and len(self.record) > 2 else None
+
+    def __repr__(self):
+        return f"OrderNode(sample_id={self.sample_id!r}, results={len(self.results)}, comments={len(self.comments)})"
+
+class ResultNode:
+    """An R record with its order and comments"""
+    __slots__ = ('record', 'order', 'comments')
+
+    def __init__(self, record, order):
+        self.record = record
+        self.order = order
+        self.comments = []
+
+    @property
+    def patient(self):
+        return self.order.patient
+
+    def __repr__(self):
+        return f"ResultNode(comments={len(self.comments)})"
+
+class MessageTree:
+    """
+    Decoded records linked along the ASTM hierarchy H -> P -> O -> R, with
+    every C record attached to the record it follows.
+
+    Orders are indexed by sample ID, so matching results to samples is a
+    dictionary lookup for the whole transmission.
+    """
+    __slots__ = ('header', 'patients', 'comments', 'terminator', '_orders_by_sample')
+
+    def __init__(self):
+        self.header = None
+        self.patients = []
+        # Comments following the header, before any patient
+        self.comments = []
+        self.terminator = None
+        self._orders_by_sample = {}
+
+    def orders_for_sample(self, sample_id) -> list:
+        """Orders placed for a sample ID"""
+        return self._orders_by_sample.get(sample_id, [])
+
+    def results_for_sample(self, sample_id) -> list:
+        """Results reported for a sample ID"""
+        return [result for order in self.orders_for_sample(sample_id) for result in order.results]
+
+    def iter_orders(self):
+        for patient in self.patients:
+            yield from patient.orders
+
+    def iter_results(self):
+        for patient in self.patients:
+            for order in patient.orders:
+                yield from order.results
+
+    def __repr__(self):
+        return f"MessageTree(header={self.header is not None}, patients={len(self.patients)}, terminator={self.terminator is not None})"
+
+def sample_key(value):
+    """Hashable sample ID of an order's specimen field"""
+    if isinstance(value, list):
+        return next((item for item in value if item is not None and not isinstance(item, list)), None)
+    return value
+
+def build_message_tree(decoded_records) -> MessageTree:
+    """
+    Link decoded records into a :class:`MessageTree` in one pass.
+
+    An O record belongs to the last P record and an R record to the last O
+    record; an O or R record with no parent gets a placeholder parent node
+    whose record is None. A C record is attached to the record just before it.
+    """
+    tree = MessageTree()
+    orders_by_sample = tree._orders_by_sample
+    patient = order = None
+    last = tree
+
+    for record in decoded_records:
+        if not record:
+            continue
+        record_type = record[0]
+
+        if record_type == 'R':
+            if order is None:
+                if patient is None:
+                    patient = PatientNode(None)
+                    tree.patients.append(patient)
+                order = OrderNode(None, patient)
+                patient.orders.append(order)
+            last = ResultNode(record, order)
+            order.results.append(last)
+        elif record_type == 'O':
+            if patient is None:
+                patient = PatientNode(None)
+                tree.patients.append(patient)
+            order = last = OrderNode(record, patient)
+            patient.orders.append(order)
+            orders_by_sample.setdefault(order.sample_id, []).append(order)
+        elif record_type == 'C':
+            last.comments.append(record)
+        elif record_type == 'P':
+            patient = last = PatientNode(record)
+            order = None
+            tree.patients.append(patient)
+        elif record_type == 'H':
+            tree.header = record
+            patient = order = None
+            last = tree
+        elif record_type == 'L':
+            tree.terminator = record
+            last = tree
+
+    return tree
@@ -0,0 +1,173 @@
+from array import array
+from calendar import timegm
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, only to_numpy and test_stats need it
+    np = None
+
+# Missing timestamp, the int64 value NumPy reads as NaT
+NAT = -(1 << 63)
+
+# R record positions
+TEST_FIELD = 2
+VALUE_FIELD = 3
+UNITS_FIELD = 4
+FLAG_FIELD = 6
+STATUS_FIELD = 8
+COMPLETED_AT_FIELD = 12
+
+class CodeTable:
+    """Interned strings as small integer codes, code 0 stands for None"""
+    __slots__ = ('labels', '_codes')
+
+    def __init__(self):
+        self.labels = [None]
+        self._codes = {None: 0}
+
+    def code(self, label) -> int:
+        code = self._codes.get(label)
+        if code is None:
+            code = self._codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def get(self, label) -> int:
+        """Code of a known label, or -1"""
+        return self._codes.get(label, -1)
+
+    def __len__(self):
+        return len(self.labels)
+
+def test_key(test):
+    """
+    Test ID of an R record's universal test ID field.
+
+    ``^^^GLU^Glucose`` decodes to ``[None, None, None, 'GLU', 'Glucose']``
+    and gives 'GLU'; otherwise the first component present is used.
+    """
+    if isinstance(test, list):
+        if len(test) > 3 and isinstance(test[3], str):
+            return test[3]
+        return next((item for item in test if isinstance(item, str)), None)
+    return test
+
+def epoch_seconds(value) -> int:
+    """Seconds since the epoch (UTC) of an ASTM YYYYMMDD[HHMM[SS]] timestamp, NAT if unreadable"""
+    if not isinstance(value, str) or len(value) not in (8, 12, 14) or not value.isdigit():
+        return NAT
+    try:
+        return timegm((int(value[0:4]), int(value[4:6]), int(value[6:8]),
+                       int(value[8:10] or 0), int(value[10:12] or 0), int(value[12:14] or 0)))
+    except ValueError:
+        return NAT
+
+def _field(record, index):
+    return record[index] if len(record) > index else None
+
+class ResultColumns:
+    """
+    Decoded R records stored column by column in typed arrays.
+
+    Values are doubles (NaN when not numeric), test IDs, units, flags and
+    statuses are codes into per-column :class:`CodeTable` instances and
+    completion times are int64 epoch seconds, so a result takes a few dozen
+    bytes instead of a list of Python strings.
+
+    :meth:`to_numpy` exposes the columns without copying. The exported
+    arrays keep the buffers pinned: appending while they are alive raises
+    ``BufferError``.
+    """
+
+    def __init__(self, records=()):
+        self.values = array('d')
+        self.tests = array('l')
+        self.units = array('l')
+        self.flags = array('l')
+        self.statuses = array('l')
+        self.completed_at = array('q')
+        self.test_codes = CodeTable()
+        self.unit_codes = CodeTable()
+        self.flag_codes = CodeTable()
+        self.status_codes = CodeTable()
+        self.extend(records)
+
+    def append(self, record):
+        """Append one decoded R record"""
+        value = _field(record, VALUE_FIELD)
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = float('nan')
+        self.values.append(value)
+        self.tests.append(self.test_codes.code(test_key(_field(record, TEST_FIELD))))
+        self.units.append(self.unit_codes.code(_field(record, UNITS_FIELD)))
+        self.flags.append(self.flag_codes.code(_field(record, FLAG_FIELD)))
+        self.statuses.append(self.status_codes.code(_field(record, STATUS_FIELD)))
+        self.completed_at.append(epoch_seconds(_field(record, COMPLETED_AT_FIELD)))
+
+    def extend(self, records):
+        """Append the R records among decoded records, others are skipped"""
+        append = self.append
+        for record in records:
+            if record and record[0] == 'R':
+                append(record)
+
+    def __len__(self):
+        return len(self.values)
+
+    def row(self, i) -> dict:
+        """One result with the codes resolved"""
+        completed_at = self.completed_at[i]
+        return {
+            'test': self.test_codes.labels[self.tests[i]],
+            'value': self.values[i],
+            'units': self.unit_codes.labels[self.units[i]],
+            'flag': self.flag_codes.labels[self.flags[i]],
+            'status': self.status_codes.labels[self.statuses[i]],
+            'completed_at': None if completed_at == NAT else completed_at,
+        }
+
+    def values_for(self, test_id) -> list:
+        """Values of one test, in arrival order"""
+        code = self.test_codes.get(test_id)
+        return [value for value, test in zip(self.values, self.tests) if test == code]
+
+    def to_numpy(self) -> dict:
+        """Zero-copy NumPy views of the columns; completed_at is datetime64[s]"""
+        if np is None:
+            raise ImportError("NumPy is required for ResultColumns.to_numpy")
+        return {
+            'values': np.frombuffer(self.values, dtype=np.float64),
+            'tests': np.frombuffer(self.tests, dtype=np.dtype('l')),
+            'units': np.frombuffer(self.units, dtype=np.dtype('l')),
+            'flags': np.frombuffer(self.flags, dtype=np.dtype('l')),
+            'statuses': np.frombuffer(self.statuses, dtype=np.dtype('l')),
+            'completed_at': np.frombuffer(self.completed_at, dtype='datetime64[s]'),
+        }
+
+    def test_stats(self) -> dict:
+        """Count, mean, min and max of the numeric values per test ID"""
+        if np is None:
+            raise ImportError("NumPy is required for ResultColumns.test_stats")
+        values = np.frombuffer(self.values, dtype=np.float64)
+        tests = np.frombuffer(self.tests, dtype=np.dtype('l'))
+        numeric = ~np.isnan(values)
+        values, tests = values[numeric], tests[numeric]
+        size = len(self.test_codes)
+        counts = np.bincount(tests, minlength=size)
+        sums = np.bincount(tests, weights=values, minlength=size)
+        minimums = np.full(size, np.inf)
+        maximums = np.full(size, -np.inf)
+        np.minimum.at(minimums, tests, values)
+        np.maximum.at(maximums, tests, values)
+
+        stats = {}
+        for code in np.flatnonzero(counts):
+            stats[self.test_codes.labels[code]] = {
+                'count': int(counts[code]),
+                'mean': float(sums[code] / counts[code]),
+                'min': float(minimums[code]),
+                'max': float(maximums[code]),
+            }
+        return stats
@@ -0,0 +1,61 @@
+from collections.abc import Sequence
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib json module is used instead
+    orjson = None
+
+def _default(obj):
+    # Lazy record views and other sequences serialise as lists
+    if isinstance(obj, Sequence) and not isinstance(obj, (str, bytes)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class JsonSerializer:
+    """
+    JSON serializer for decoded records and LIS messages.
+
+    Uses orjson when it is installed and the stdlib json module otherwise.
+    orjson only indents by 2 spaces, so other indents always use json.
+    Records are written as they are, without copying them first.
+
+    :param indent: None for compact output, else the indent width
+    :param backend: 'orjson' or 'json', None picks the fastest available
+    """
+
+    def __init__(self, indent=None, backend=None):
+        if backend is None:
+            backend = 'orjson' if orjson is not None and indent in (None, 2) else 'json'
+        if backend == 'orjson' and (orjson is None or indent not in (None, 2)):
+            raise ValueError(f"orjson backend unavailable for indent={indent!r}")
+        if backend not in ('orjson', 'json'):
+            raise ValueError(f"Unknown JSON backend '{backend}'")
+        self.indent = indent
+        self.backend = backend
+        self._option = orjson.OPT_INDENT_2 if backend == 'orjson' and indent else 0
+
+    def dumps(self, obj) -> str:
+        """Serialise to str"""
+        if self.backend == 'orjson':
+            return orjson.dumps(obj, default=_default, option=self._option).decode('utf-8')
+        if self.indent is None:
+            return json.dumps(obj, default=_default, separators=(',', ':'))
+        return json.dumps(obj, default=_default, indent=self.indent)
+
+    def dumps_bytes(self, obj) -> bytes:
+        """Serialise to UTF-8 bytes, ready to forward"""
+        if self.backend == 'orjson':
+            return orjson.dumps(obj, default=_default, option=self._option)
+        return self.dumps(obj).encode('utf-8')
+
+PRETTY = JsonSerializer(indent=2)
+COMPACT = JsonSerializer()
+
+def get_serializer(indent=2) -> JsonSerializer:
+    """Shared serializer for an indent, None for compact output"""
+    if indent == 2:
+        return PRETTY
+    if indent is None:
+        return COMPACT
+    return JsonSerializer(indent)
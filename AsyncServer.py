@@ -0,0 +1,85 @@
+from core.Dispatcher import MyDispatcher
+from core.AsyncHandler import AsyncRequestHandler
+from config import SERVER_BACKLOG
+import asyncio
+import logging
+
+log = logging.getLogger(__name__)
+
+class AsyncServer:
+    """
+    asyncio server for analyzer connections, the counterpart of :class:`Server.Server`.
+
+    Every accepted socket gets its own :class:`AsyncRequestHandler` protocol
+    and dispatcher, all served by one event loop (epoll/kqueue backed where
+    available) instead of the select-based astm.asynclib loop.
+    """
+
+    dispatcher = MyDispatcher
+
+    def __init__(self, host='localhost', port=15200, request=None, encoding=None, timeout=None,
+                 backlog=SERVER_BACKLOG, analyzer=None):
+        """
+        :param port: Port to listen on, 0 for one picked by the OS
+        :param request: Protocol class per connection, :class:`AsyncRequestHandler` by default
+        :param timeout: Seconds of silence before a connection is closed, None to never close
+        :param backlog: Pending connections the listening socket queues
+        :param analyzer: Analyzer name of every connection, by default the one configured for the peer's ip
+        """
+        self.host = host
+        self.port = port
+        self.encoding = encoding
+        self.timeout = timeout
+        self.backlog = backlog
+        self.analyzer = analyzer
+        self.requestHandler = request or AsyncRequestHandler
+        self._server = None
+
+    def _make_handler(self):
+        return self.requestHandler(self.dispatcher(self.encoding), self.encoding, timeout=self.timeout,
+                                   analyzer=self.analyzer)
+
+    async def start(self):
+        """Bind and start accepting connections"""
+        if not self.host or self.port is None:
+            raise ConnectionError(f"Invalid server address {self.host}:{self.port}")
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(self._make_handler, self.host, self.port,
+                                                backlog=self.backlog, reuse_address=True)
+        log.info('Server listening on %s:%s', self.host, self.sockets[0].getsockname()[1])
+        return self
+
+    @property
+    def sockets(self):
+        return self._server.sockets if self._server is not None else ()
+
+    async def serve_forever(self):
+        """Start the server and handle connections until cancelled"""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            log.info('Server shutting down...')
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+if __name__ == '__main__':
+    server = AsyncServer(
+            host='localhost',
+            port=15200,
+            encoding='latin-1'
+    )
+    print("Server starting on localhost:15200")
+    print("Press Ctrl+C to stop the server")
+
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
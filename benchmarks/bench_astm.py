@@ -0,0 +1,211 @@
+"""
+Benchmarks for the ASTM parser and framer.
+
+Run from the project root::
+
+    python -m benchmarks.bench_astm                          # full suite
+    python -m benchmarks.bench_astm --sizes 1 1000 --mix mixed
+    python -m benchmarks.bench_astm -o new.json --compare baseline.json
+"""
+from Analyzers.Bs240.Protocol.Astm.Parser.Astmparser import (
+    enhanced_decode, aggregate_frames, decode_multiple_messages, build_astm_frames, build_astm_buffer,
+    frame_astm_message, get_record_encoder, make_frame,
+)
+from Analyzers.Bs240.Protocol.Astm.Records.ASTMMessage import LISMessage
+from Analyzers.Bs240.Protocol.Astm.Records.CompactRecords import record_field_names
+from core.Dispatcher import MyDispatcher
+from astm.constants import ENCODING
+from benchmarks.synthetic import make_records, MIXES
+from config import MAX_FRAME_BODY_SIZE
+from datetime import datetime
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+DEFAULT_SIZES = [1, 10, 100, 1000, 10000, 100000]
+DEFAULT_OUTPUT = "bench_results.json"
+
+class Workload:
+    """One synthetic transmission in every shape the benchmarked functions take"""
+
+    def __init__(self, size, mix, chunk_size):
+        self.size = size
+        self.mix = mix
+        self.records = make_records(size, mix)
+        self.message = '\r'.join(self.records) + '\r'
+        self.frames = build_astm_frames(self.message, chunk_size)
+        self.data = b''.join(self.frames)
+        self.nbytes = len(self.data)
+        # The same records as concatenated single-frame messages, one record
+        # per frame: the byte-stream decoders decode every frame on its own,
+        # so records split over ETB frames would come out as fragments
+        self.messages = b''.join(
+            make_frame(i % 7 + 1, (record + '\r').encode(ENCODING), True)
+            for i, record in enumerate(self.records)
+        )
+        self.decoded = enhanced_decode(self.frames)
+        self.lis_message = LISMessage().create_lis_obj(self.decoded)
+
+def wrappable_records(dispatcher, records):
+    """
+    Records the dispatcher's astm classes accept.
+
+    Values past the last field of the record class are cut off (the astm
+    mapping classes reject them) and records still rejected are left out,
+    such as the H record, whose delimiter field is a constant.
+    """
+    sizes = {rtype: len(record_field_names(wrapper)) for rtype, wrapper in dispatcher.wrappers.items()}
+    accepted = []
+    for record in records:
+        record = record[:sizes.get(record[0], len(record))]
+        try:
+            dispatcher.wrap(record)
+        except ValueError:
+            continue
+        accepted.append(record)
+    return accepted
+
+def benchmark_cases(workload, chunk_size):
+    """Return (name, callable) pairs timed for a workload"""
+    dispatcher = MyDispatcher(ENCODING, compact=False)
+    compact_dispatcher = MyDispatcher(ENCODING, compact=True)
+    # Both wrap rows run on the same records so they stay comparable
+    wrapped = wrappable_records(dispatcher, workload.decoded)
+    return [
+        ("enhanced_decode", lambda: enhanced_decode(workload.messages)),
+        ("enhanced_decode[frames]", lambda: enhanced_decode(workload.frames)),
+        ("aggregate_frames", lambda: aggregate_frames(workload.frames)),
+        ("decode_multiple_messages", lambda: decode_multiple_messages(workload.messages, ENCODING)),
+        ("build_astm_frames", lambda: build_astm_frames(workload.message, chunk_size)),
+        ("build_astm_buffer", lambda: build_astm_buffer(workload.message, chunk_size)),
+        ("frame_astm_message", lambda: frame_astm_message([workload.records])),
+        ("encode_records", lambda: get_record_encoder().encode_records(workload.decoded)),
+        # JSON forwarding: the former to_dict copy + json.dumps path against the serializer
+        ("json[to_dict]", lambda: json.dumps(workload.lis_message.to_dict(), indent=2)),
+        ("LISMessage.to_json", lambda: workload.lis_message.to_json()),
+        ("LISMessage.to_json_bytes", lambda: workload.lis_message.to_json_bytes()),
+        # Record wrapping: astm mapping classes against the __slots__ records, the peak is the memory held
+        ("wrap[astm]", lambda: [dispatcher.wrap(record) for record in wrapped]),
+        ("wrap[compact]", lambda: [compact_dispatcher.wrap(record) for record in wrapped]),
+    ]
+
+def time_call(func, min_time=0.2, repeat=3):
+    """Best seconds per call over `repeat` rounds of at least `min_time` each"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+def measure_allocations(func):
+    """Peak traced memory (bytes) and number of blocks still allocated by one call"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = func()
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    del result
+    return peak, blocks
+
+def run(sizes, mixes, chunk_size, min_time, repeat, allocations=True, out=sys.stdout):
+    results = []
+    for mix in mixes:
+        for size in sizes:
+            workload = Workload(size, mix, chunk_size)
+            for name, func in benchmark_cases(workload, chunk_size):
+                seconds = time_call(func, min_time, repeat)
+                entry = {
+                    "name": name,
+                    "mix": mix,
+                    "records": size,
+                    "frames": len(workload.frames),
+                    "bytes": workload.nbytes,
+                    "seconds": seconds,
+                    "records_per_s": size / seconds if seconds else None,
+                    "mb_per_s": workload.nbytes / seconds / 1e6 if seconds else None,
+                }
+                if allocations:
+                    entry["peak_alloc_bytes"], entry["alloc_blocks"] = measure_allocations(func)
+                results.append(entry)
+                print(format_entry(entry), file=out)
+    return results
+
+def format_entry(entry):
+    line = (f"{entry['name']:<26} {entry['mix']:<8} {entry['records']:>7} rec "
+            f"{entry['records_per_s']:>13,.0f} rec/s {entry['mb_per_s']:>9.2f} MB/s")
+    if "peak_alloc_bytes" in entry:
+        line += f" {entry['peak_alloc_bytes']:>13,} B peak"
+    return line
+
+def compare(results, baseline, threshold):
+    """Print the throughput change against a baseline run; return the regressions"""
+    previous = {(e["name"], e["mix"], e["records"]): e for e in baseline["results"]}
+    regressions = []
+    for entry in results:
+        old = previous.get((entry["name"], entry["mix"], entry["records"]))
+        if not old or not old.get("records_per_s") or not entry["records_per_s"]:
+            continue
+        change = entry["records_per_s"] / old["records_per_s"] - 1
+        marker = ""
+        if change < -threshold:
+            marker = "  <-- regression"
+            regressions.append(entry)
+        print(f"{entry['name']:<26} {entry['mix']:<8} {entry['records']:>7} rec {change:>+8.1%}{marker}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ASTM parser and framer.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Records per transmission")
+    parser.add_argument("--mix", nargs="+", default=["results"], choices=sorted(MIXES), help="Record mixes")
+    parser.add_argument("--chunk-size", type=int, default=MAX_FRAME_BODY_SIZE, help="Frame body size")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timing round")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing rounds, the best one is kept")
+    parser.add_argument("--no-alloc", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown reported as regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.mix, args.chunk_size, args.min_time, args.repeat, not args.no_alloc)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "chunk_size": args.chunk_size,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Synthetic ASTM transmissions for the benchmark suite."""
+import random
+
+HEADER = ("H|\\^&|BS240|MINDRAY|Mindray BS-240|123 Healthcare Ave^^Mumbai^MH^400001|Lab Manager|"
+          "+919876543210|CAPS-A|LabSystem|Clinical Chemistry|P|1.2.1|20250626140530|")
+TERMINATOR = "L|1|N"
+
+TESTS = [
+    ("GLU", "Glucose", "mg/dL", "70_99"),
+    ("CHOL", "Total Cholesterol", "mg/dL", "<200"),
+    ("TG", "Triglycerides", "mg/dL", "<150"),
+    ("HDL", "HDL Cholesterol", "mg/dL", ">40"),
+    ("ALT", "Alanine Aminotransferase", "U/L", "7_56"),
+    ("AST", "Aspartate Aminotransferase", "U/L", "10_40"),
+    ("CREA", "Creatinine", "mg/dL", "0.7_1.3"),
+    ("UREA", "Urea", "mg/dL", "15_40"),
+    ("WBC", "White Blood Cells", "10^3/uL", "4.0_11.0"),
+    ("HGB", "Hemoglobin", "g/dL", "13.5_17.5"),
+    ("PLT", "Platelets", "10^3/uL", "150_450"),
+]
+
+# Relative weights of P, O, R and C records for each mix
+MIXES = {
+    "results": {"P": 1, "O": 2, "R": 12, "C": 1},
+    "orders": {"P": 1, "O": 4, "R": 0, "C": 0},
+    "mixed": {"P": 2, "O": 4, "R": 6, "C": 3},
+}
+
+def patient_record(seq, rnd):
+    return (f"P|{seq}|{10000 + seq}||{60000 + seq}|SHARMA^RAJESH^KUMAR|PATEL|19850315|"
+            f"{rnd.choice('MF')}|I|402 Tower A^^Mumbai^MH^400052||+919988776655|DR001|INS12345|"
+            "POL67890|178|72|HTN^DM|Amlodipine^Metformin|Vegetarian^Diabetic|CARDIO|REF001|"
+            "20250625^20250627|Outpatient|General Ward")
+
+def order_record(seq, test, rnd):
+    code, name = test[0], test[1]
+    return f"O|{seq}|{code}{seq:05d}||^^^{code}^{name}||20250626080000|||||F||||1||||||||||O"
+
+def result_record(seq, test, rnd):
+    code, name, units, ref = test
+    value = round(rnd.uniform(1, 300), 1)
+    flag = rnd.choice("NNNHL")
+    return (f"R|{seq}|^^^{code}^{name}|{value}|{units}|{ref}|{flag}||F||tech001|"
+            "20250626081500||V1.0|MINDRAY BS-240")
+
+def comment_record(seq, rnd):
+    return f"C|{seq}|I|Sample {seq} checked \\ fasting for 12 hours|G"
+
+def make_records(count, mix="results", seed=0) -> list:
+    """
+    Build a transmission of `count` records (including H and L) as strings.
+
+    :param count: Total number of records, at least 1
+    :param mix: Name of a record mix from MIXES
+    """
+    rnd = random.Random(seed)
+    weights = MIXES[mix]
+    types = [t for t in "POCR" if weights[t]]
+    body_count = max(count - 2, 0)
+
+    records = [HEADER]
+    seq = {"P": 0, "O": 0, "R": 0, "C": 0}
+    test = TESTS[0]
+    for i in range(body_count):
+        # Always open with a patient so orders and results have a parent
+        rtype = "P" if i == 0 else rnd.choices(types, [weights[t] for t in types])[0]
+        seq[rtype] += 1
+        if rtype == "P":
+            records.append(patient_record(seq["P"], rnd))
+        elif rtype == "O":
+            test = rnd.choice(TESTS)
+            records.append(order_record(seq["O"], test, rnd))
+        elif rtype == "R":
+            records.append(result_record(seq["R"], test, rnd))
+        else:
+            records.append(comment_record(seq["C"], rnd))
+    if count > 1:
+        records.append(TERMINATOR)
+    return records[:count]
@@ -13,6 +13,18 @@ DEFAULT_STOP_BITS = "1"
 LOG_FILE_PATH = "logs/app.log"
 MAX_FRAME_BODY_SIZE = 240
 
+# Per-analyzer connection and message template settings
+ANALYZER_CONFIG_PATH = "AnalyzerConfig.json"
+
+# Wrap dispatched records in the __slots__ record types instead of the astm classes
+COMPACT_RECORDS = False
+
+# Distinct field values interned per analyzer by the record decoder, 0 disables interning
+INTERN_TABLE_SIZE = 4096
+
+# Pending connections queued by the asyncio server's listening socket
+SERVER_BACKLOG = 512
+
 single_test = ('1H|\\^&|BS240|MINDRAY|Mindray BS-240|123 Healthcare Ave^^Mumbai^MH^400001|Lab Manager|+919876543210|CAPS-A|LabSystem|Clinical Chemistry|P|1.2.1|20250626140530|\r'
     'P|1|12345||67890|SHARMA^RAJESH^KUMAR|PATEL|19850315|M|I|402 Tower A^^Mumbai^MH^400052||+919988776655|DR001|INS12345|POL67890|178|72|HTN^DM|Amlodipine^Metformin|Vegetarian^Diabetic|CARDIO|REF001|20250625^20250627|Outpatient|General Ward\r'
     'O|1|GLU01||^^^GLU^Glucose||20250626080000|||||F||||1||||||||||O\r'
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import logging
+from astm.constants import CRLF, ENQ, EOT, ACK, NAK
+from astm.exceptions import NotAccepted, InvalidState
+from Analyzers.Bs240.Protocol.Astm.Parser.Astmstream import AstmStreamDecoder
+from config import ANALYZER_CONFIG_PATH
+
+log = logging.getLogger(__name__)
+
+# Bytes held while waiting for a frame's CRLF before the buffer is dropped
+MAX_PENDING_BYTES = 64 * 1024
+
+# Configuration path -> {ip: analyzer name} of its socket analyzers
+_ANALYZER_HOSTS = {}
+
+def configured_analyzer(host, path=ANALYZER_CONFIG_PATH):
+    """Name of the socket analyzer configured with this ip in AnalyzerConfig.json, or None"""
+    hosts = _ANALYZER_HOSTS.get(path)
+    if hosts is None:
+        try:
+            with open(path, encoding='utf-8') as f:
+                analyzers = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning('Cannot read analyzer configuration %s: %s', path, e)
+            analyzers = {}
+        hosts = _ANALYZER_HOSTS[path] = {
+            entry['config']['ip']: name for name, entry in analyzers.items()
+            if entry.get('isSocket') and 'ip' in entry.get('config', {})
+        }
+    return hosts.get(host)
+
+class AsyncRequestHandler(asyncio.Protocol):
+    """
+    One analyzer connection on the asyncio server.
+
+    Runs the ENQ/ACK/NAK/EOT state machine of :class:`core.Handler.RequestHandler`:
+    outside a transfer every byte is a control character, inside one the
+    input is cut at CRLF (end of frame) or EOT. Frames are fed to an
+    :class:`AstmStreamDecoder` and the records they complete are passed to
+    the dispatcher.
+
+    ``analyzer`` names the per-analyzer decoder state (delimiters, intern
+    table); without one the analyzer configured for the peer's ip is used
+    (see :func:`configured_analyzer`), and an unknown peer shares the
+    unnamed state, so that state never grows with the connecting hosts.
+    """
+
+    def __init__(self, dispatcher, encoding=None, timeout=None, analyzer=None):
+        self.analyzer = analyzer
+        self._decoder = self._make_decoder(encoding)
+        self.dispatcher = dispatcher
+        self.encoding = encoding
+        self.timeout = timeout
+        self.transport = None
+        self.client_info = {'host': None, 'port': None}
+        self._is_transfer_state = False
+        self._buffer = bytearray()
+        self._timer = None
+
+    def _make_decoder(self, encoding):
+        if encoding:
+            return AstmStreamDecoder(encoding, analyzer=self.analyzer, recover=True)
+        return AstmStreamDecoder(analyzer=self.analyzer, recover=True)
+
+    def connection_made(self, transport):
+        self.transport = transport
+        peer = transport.get_extra_info('peername')
+        if peer:
+            self.client_info = {'host': peer[0], 'port': peer[1]}
+            if self.analyzer is None:
+                self.analyzer = configured_analyzer(peer[0])
+                if self.analyzer is not None:
+                    self._decoder = self._make_decoder(self.encoding)
+        log.info('New client connection from %s:%s', self.client_info['host'], self.client_info['port'])
+        self._reset_timer()
+
+    def connection_lost(self, exc):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._buffer.clear()
+        self._decoder.reset()
+        log.info('Client %s:%s disconnected', self.client_info['host'], self.client_info['port'])
+
+    def data_received(self, data):
+        self._reset_timer()
+        buffer = self._buffer
+        buffer += data
+        while buffer:
+            if not self._is_transfer_state or buffer[0] == ENQ[0]:
+                control = bytes(buffer[:1])
+                del buffer[:1]
+                self._respond(control)
+                continue
+
+            eot = buffer.find(EOT)
+            crlf = buffer.find(CRLF)
+            if crlf != -1 and (eot == -1 or crlf < eot):
+                message = bytes(buffer[:crlf + 2])
+                del buffer[:crlf + 2]
+                self._respond(message)
+            elif eot != -1:
+                if eot:
+                    log.warning('Discarding %d bytes of unterminated frame before EOT', eot)
+                del buffer[:eot + 1]
+                self._respond(EOT)
+            else:
+                if len(buffer) > MAX_PENDING_BYTES:
+                    log.error('No frame terminator in %d bytes, discarding input', len(buffer))
+                    self.discard_input_buffers()
+                    self._write(NAK)
+                break
+
+    def _respond(self, data):
+        try:
+            response = self.dispatch(data)
+        except (NotAccepted, InvalidState) as e:
+            log.error('%s', e)
+            response = NAK
+        self._write(response)
+
+    def _write(self, response):
+        if response is not None and self.transport is not None and not self.transport.is_closing():
+            self.transport.write(response)
+
+    def dispatch(self, data):
+        """Response to one control character or frame"""
+        if data == ENQ:
+            return self.on_enq()
+        if data == ACK:
+            return self.on_ack()
+        if data == NAK:
+            return self.on_nak()
+        if data == EOT:
+            return self.on_eot()
+        return self.on_message(data)
+
+    def on_enq(self):
+        if not self._is_transfer_state:
+            log.debug("Received the enq on server")
+            self._is_transfer_state = True
+            self._decoder.reset()
+            return ACK
+        else:
+            log.error('ENQ is not expected')
+            return NAK
+
+    def on_ack(self):
+        raise NotAccepted('Server should not be ACKed.')
+
+    def on_nak(self):
+        raise NotAccepted('Server should not be NAKed.')
+
+    def on_eot(self):
+        if self._is_transfer_state:
+            self._is_transfer_state = False
+            self._decoder.reset()
+            return ACK
+        else:
+            raise InvalidState('Server is not ready to accept EOT message.')
+
+    def on_message(self, data):
+        if not self._is_transfer_state:
+            self.discard_input_buffers()
+            return NAK
+        try:
+            # Records completed by this frame; an intermediate (ETB) frame
+            # may legitimately complete none of them
+            rejected = self._decoder.counters['frames_rejected']
+            parsed = list(self._decoder.feed(data))
+            if self._decoder.has_partial_frame:
+                self._decoder.reset(transmission=False)
+                return NAK
+            if self._decoder.counters['frames_rejected'] != rejected:
+                # Quarantined; the analyzer retransmits the frame on NAK
+                return NAK
+        except Exception as e:
+            log.exception('Error occurred on message handling: %s', e)
+            return NAK
+        # The frame is accepted once it decodes: a NAK for a record the
+        # dispatcher cannot handle would only bring the same frame back
+        for record in parsed:
+            self.dispatch_record(record)
+        return ACK
+
+    def dispatch_record(self, record):
+        """Hand a decoded record to the dispatcher's handler for its type, logging any failure"""
+        dispatcher = self.dispatcher
+        if dispatcher is None or not record:
+            return
+        handler = dispatcher.dispatch.get(record[0], dispatcher.on_unknown)
+        try:
+            handler(dispatcher.wrap(record))
+        except Exception as e:
+            log.exception('Error dispatching %s record: %s', record[0], e)
+
+    def discard_input_buffers(self):
+        self._buffer.clear()
+        self._decoder.reset()
+
+    def on_timeout(self):
+        """Closes connection on timeout."""
+        log.warning('Client %s:%s timed out', self.client_info['host'], self.client_info['port'])
+        if self.transport is not None:
+            self.transport.close()
+
+    def _reset_timer(self):
+        if self.timeout is None:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(self.timeout, self.on_timeout)
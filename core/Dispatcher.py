@@ -4,13 +4,21 @@ from Analyzers.Bs240.Protocol.Astm.Records.PatientRecord import ExtendedPatientR
 from Analyzers.Bs240.Protocol.Astm.Records.OrderRecord import ExtendedOrderRecord
 from Analyzers.Bs240.Protocol.Astm.Records.ResultRecord import ExtendedResultRecord
 from Analyzers.Bs240.Protocol.Astm.Records.CommentRecord import ExtendedCommentRecord
+from Analyzers.Bs240.Protocol.Astm.Records.CompactRecords import COMPACT_WRAPPERS
 from astm.records import TerminatorRecord
+from config import COMPACT_RECORDS
 
 class MyDispatcher(BaseRecordsDispatcher):
 
-    def __init__(self, encoding=None):
+    # Opt in to the __slots__ record types, see Records/CompactRecords.py
+    compact = COMPACT_RECORDS
+
+    def __init__(self, encoding=None, compact=None):
         super(MyDispatcher, self).__init__(encoding)
 
+        if compact is not None:
+            self.compact = compact
+
         self.wrappers = {
             'H': ExtraHeaderFields,
             'P': ExtendedPatientRecord,
@@ -20,6 +28,8 @@ class MyDispatcher(BaseRecordsDispatcher):
             # 'Q': QueryRecord,
             'L': TerminatorRecord
         }
+        if self.compact:
+            self.wrappers.update(COMPACT_WRAPPERS)
         self.dispatch['M'] = self.my_handler
 
     def my_handler(self, record):
@@ -2,13 +2,14 @@ import logging
 from astm.protocol import ASTMProtocol 
 from astm.constants import CRLF, EOT, ACK, NAK
 from astm.exceptions import NotAccepted, InvalidState
-from Analyzers.Bs240.Protocol.Astm.Parser.Astmparser import enhanced_decode
+from Analyzers.Bs240.Protocol.Astm.Parser.Astmstream import AstmStreamDecoder
 
 log = logging.getLogger(__name__)
 
 class RequestHandler(ASTMProtocol):
 
     def __init__(self, sock, dispatcher, encoding, timeout=None):
+        self._decoder = AstmStreamDecoder(encoding, recover=True) if encoding else AstmStreamDecoder(recover=True)
         super(RequestHandler, self).__init__(sock, timeout=timeout)
         self._chunks = []
         host, port = sock.getpeername() if sock is not None else (None, None)
@@ -22,6 +23,7 @@ class RequestHandler(ASTMProtocol):
         if not self._is_transfer_state:
             log.debug("Received the enq on server")
             self._is_transfer_state = True
+            self._decoder.reset()
             self.terminator = [CRLF, EOT]
             return ACK
         else:
@@ -37,6 +39,7 @@ class RequestHandler(ASTMProtocol):
     def on_eot(self):
         if self._is_transfer_state:
             self._is_transfer_state = False
+            self._decoder.reset()
             self.terminator = 1
             return ACK
         else:
@@ -52,8 +55,16 @@ class RequestHandler(ASTMProtocol):
                     print('The last received is string converting it to bytes...')
                     self._last_recv_data = self._last_recv_data.strip().encode()
                 
-                parsed = enhanced_decode(self._last_recv_data)
-                if not parsed:
+                # Decode the records completed by this frame; an intermediate
+                # (ETB) frame may legitimately complete none of them
+                rejected = self._decoder.counters['frames_rejected']
+                for _record in self._decoder.feed(self._last_recv_data):
+                    pass
+                if self._decoder.has_partial_frame:
+                    self._decoder.reset(transmission=False)
+                    return NAK
+                if self._decoder.counters['frames_rejected'] != rejected:
+                    # Quarantined; the analyzer retransmits the frame on NAK
                     return NAK
                 
                 return ACK
@@ -67,6 +78,7 @@ class RequestHandler(ASTMProtocol):
 
     def discard_input_buffers(self):
         self._chunks = []
+        self._decoder.reset()
         return super(RequestHandler, self).discard_input_buffers()
 
     def on_timeout(self):
@@ -69,9 +69,9 @@ if __name__ == '__main__':
 
     # Suppose the list[list[str]] is coming from the client
 
-    framedOutput:list[bytes] = frame_astm_message(analyzerOutput) 
+    framedOutput:list[memoryview] = frame_astm_message(analyzerOutput) 
     for f in framedOutput:
-        print(f"frame:{f}  length: {len(f)}")
+        print(f"frame:{bytes(f)}  length: {len(f)}")
 
     try:
         records = enhanced_decode(framedOutput)
@@ -0,0 +1,35 @@
+from Analyzers.Bs240.Protocol.Astm.Parser.Astmdownload import OrderDownload, renumber_frame
+from Analyzers.Bs240.Protocol.Astm.Parser.Astmparser import make_frame
+import itertools
+import threading
+import time
+
+def test_renumber_frame_fixes_the_checksum():
+    body = b'O|1|GLU01||^^^GLU^Glucose\r'
+    for is_final in (False, True):
+        frame = make_frame(1, body, is_final)
+        for frame_number in range(1, 8):
+            assert renumber_frame(frame, frame_number) == make_frame(frame_number, body, is_final)
+
+def slow_worklist():
+    for i in itertools.count(1):
+        time.sleep(0.01)
+        yield ['P', str(i)]
+
+def test_cancel_ends_the_iteration_of_a_waiting_consumer():
+    download = OrderDownload(slow_worklist(), workers=1, batch_size=1, queue_size=1)
+    received = threading.Event()
+    frames = []
+
+    def consume():
+        for frame in download:
+            frames.append(frame)
+            received.set()
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+    assert received.wait(5)
+    download.cancel()
+    consumer.join(5)
+    assert not consumer.is_alive()
+    assert frames[0] == make_frame(1, b'P|1\r', False)
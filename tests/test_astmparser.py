@@ -0,0 +1,56 @@
+from Analyzers.Bs240.Protocol.Astm.Parser.Astmparser import (
+    decode_records, delimiters_from_header, enhanced_decode, get_record_decoder, get_record_encoder, make_frame,
+    parse_astm_complete_transmission,
+)
+import pytest
+from config import single_test
+
+def test_record_fragment_starting_with_h_is_not_a_header():
+    assert delimiters_from_header(b'HDL^HDL Cholesterol|1.2|mmol/L') is None
+    # A frame boundary right before "HDL" makes the fragment look like a record
+    data = (make_frame(1, b'H|\\^&|||BS240\rR|1|^^^', False)
+            + make_frame(2, b'HDL^HDL Cholesterol|1.2|mmol/L\rL|1|N\r', True))
+    records = enhanced_decode(data)
+    assert records[0][:2] == ['H', ['\\', '^', '&']]
+    assert records[-1] == ['L', '1', 'N']
+
+def test_header_is_only_honoured_at_the_start_of_a_message():
+    records = decode_records(b'H!\\@%!!!BS240\rP!1\rH|\\^&|x\rL!1!N\rH|\\^&|y\rL|1|N\r', 'latin-1')
+    assert records[1] == ['P', '1']
+    assert records[3] == ['L', '1', 'N']
+    assert records[4] == ['H', ['\\', '^', '&'], 'y']
+    assert records[5] == ['L', '1', 'N']
+
+def test_parse_results_carry_json_unless_lazy():
+    eager = parse_astm_complete_transmission(single_test)['records']['results'][0]
+    assert list(eager) == ['data', 'json']
+    lazy = parse_astm_complete_transmission(single_test, lazy_json=True)['records']['results'][0]
+    assert 'json' not in lazy
+    assert lazy['json'] == eager['json']
+
+ESCAPES = [
+    (b'R|1|a&F&b', 'a|b'),
+    (b'R|1|a&S&b', 'a^b'),
+    (b'R|1|a&R&b', 'a\\b'),
+    (b'R|1|a&E&b', 'a&b'),
+]
+
+@pytest.mark.parametrize('raw, value', ESCAPES)
+def test_escape_sequences_are_decoded(raw, value):
+    assert get_record_decoder().decode_record(raw) == ['R', '1', value]
+
+@pytest.mark.parametrize('raw, value', ESCAPES)
+def test_delimiters_in_data_are_escaped(raw, value):
+    assert get_record_encoder().encode_record(['R', '1', value]) == raw.decode()
+
+def test_literal_escape_character_is_kept():
+    assert get_record_decoder().decode_record(b'R|1|A & B|A&B') == ['R', '1', 'A & B', 'A&B']
+
+@pytest.mark.parametrize('record', [
+    ['R', '1', 'a|b^c\\d&e'],
+    ['R', '1', 'A & B', 'x&F'],
+    ['R', '1', ['x^y', 'z'], [['a|b', 'c'], ['d&e', None]]],
+])
+def test_escapes_round_trip(record):
+    encoded = get_record_encoder().encode_record(record)
+    assert get_record_decoder().decode_record(encoded.encode()) == record
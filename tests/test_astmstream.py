@@ -0,0 +1,25 @@
+from Analyzers.Bs240.Protocol.Astm.Parser.Astmparser import build_astm_frames, enhanced_decode
+from Analyzers.Bs240.Protocol.Astm.Parser.Astmstream import AstmStreamDecoder
+from config import single_test
+
+def corrupt(frame: bytes) -> bytes:
+    frame = bytearray(frame)
+    frame[10] ^= 1
+    return bytes(frame)
+
+def test_retransmitted_frame_loses_nothing():
+    frames = build_astm_frames(single_test, 60)
+    data = b''.join(frames[:2]) + corrupt(frames[2]) + b''.join(frames[2:])
+    decoder = AstmStreamDecoder(recover=True)
+    assert list(decoder.feed(data)) == enhanced_decode(frames)
+    assert decoder.quarantine.reasons == {'checksum': 1}
+
+def test_lost_frame_yields_no_record_fragments():
+    frames = build_astm_frames(single_test, 60)
+    expected = enhanced_decode(frames)
+    for lost in range(1, len(frames) - 1):
+        data = b''.join(frames[:lost]) + corrupt(frames[lost]) + b''.join(frames[lost + 1:])
+        decoder = AstmStreamDecoder(recover=True)
+        records = list(decoder.feed(data))
+        assert all(record in expected for record in records), lost
+        assert records[-1] == ['L', '1', 'N']
@@ -0,0 +1,54 @@
+import asyncio
+from astm.constants import ENCODING, ENQ, EOT, ACK
+from Analyzers.Bs240.Protocol.Astm.Parser.Astmparser import build_astm_frames
+from AsyncServer import AsyncServer
+from core.AsyncHandler import AsyncRequestHandler
+from core.Dispatcher import MyDispatcher
+from config import single_test
+
+class RecordingDispatcher(MyDispatcher):
+    records = []
+
+    def on_terminator(self, record):
+        self.records.append(record)
+
+async def send_transmission(messages):
+    server = AsyncServer('127.0.0.1', 0, encoding=ENCODING, analyzer='BS240')
+    server.dispatcher = RecordingDispatcher
+    await server.start()
+    try:
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        responses = []
+        for message in messages:
+            writer.write(message)
+            await writer.drain()
+            responses.append(await asyncio.wait_for(reader.readexactly(1), 5))
+        writer.close()
+        await writer.wait_closed()
+        return responses
+    finally:
+        await server.close()
+
+def test_single_test_transmission_is_acked():
+    RecordingDispatcher.records = []
+    frames = build_astm_frames(single_test, 60)
+    responses = asyncio.run(send_transmission([ENQ, *frames, EOT]))
+    assert responses == [ACK] * (len(frames) + 2)
+    # Records the astm classes reject are logged, the rest are still dispatched
+    assert len(RecordingDispatcher.records) == 1
+
+class PeerTransport:
+    def __init__(self, host):
+        self.host = host
+
+    def get_extra_info(self, name):
+        return (self.host, 40000) if name == 'peername' else None
+
+def test_connections_are_named_after_the_configured_analyzer():
+    handler = AsyncRequestHandler(None)
+    handler.connection_made(PeerTransport('192.168.0.10'))
+    assert handler.analyzer == 'ErbaElite580'
+    unknown = AsyncRequestHandler(None)
+    unknown.connection_made(PeerTransport('10.1.2.3'))
+    assert unknown.analyzer is None
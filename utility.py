@@ -1,10 +1,19 @@
 import io
 from typing import Any, List, Optional
 from datetime import datetime
+from functools import lru_cache
 import os
 
 from pydantic import FilePath
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, only parse_datetime_column needs it
+    np = None
+
+# Distinct timestamps remembered by parse_datetime
+DATETIME_CACHE_SIZE = 1024
+
 def is_number(value: Any) -> bool:
     return isinstance(value, (int, float))
 
@@ -28,16 +37,64 @@ def parse_datetime(date_str: str) -> Optional[str]:
     """Parse ASTM datetime format (YYYYMMDDHHMMSS) to ISO format"""
     if not date_str or len(date_str) < 8:
         return None
+    return _parse_datetime(date_str)
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _parse_datetime(date_str: str) -> str:
+    # Slice the fixed-width digits instead of going through strptime, the
+    # timestamps of one transmission repeat so the results are cached
+    size = len(date_str)
+    if size != 8 and size != 14:
+        return date_str
+    if not (date_str.isascii() and date_str.isdigit()):
+        return date_str
     try:
-        if len(date_str) == 8:
-            dt = datetime.strptime(date_str, "%Y%m%d")
-        elif len(date_str) == 14:
-            dt = datetime.strptime(date_str, "%Y%m%d%H%M%S")
+        if size == 8:
+            dt = datetime(int(date_str[0:4]), int(date_str[4:6]), int(date_str[6:8]))
         else:
-            return date_str
-        return dt.isoformat()
+            dt = datetime(int(date_str[0:4]), int(date_str[4:6]), int(date_str[6:8]),
+                          int(date_str[8:10]), int(date_str[10:12]), int(date_str[12:14]))
     except ValueError:
         return date_str
+    return dt.isoformat()
+
+def parse_datetime_column(values):
+    """
+    Convert a column of ASTM timestamps (YYYYMMDD or YYYYMMDDHHMMSS) to a
+    NumPy ``datetime64[s]`` array in one pass.
+
+    Values that are missing, of another length or not a valid date and time
+    become NaT.
+    """
+    if np is None:
+        raise ImportError("NumPy is required for parse_datetime_column")
+    # Lengths and ASCII are checked on the str values: the S14 conversion
+    # would truncate longer strings and fail on non-ASCII ones
+    raw = np.array([value if isinstance(value, str) and len(value) in (8, 14) and value.isascii() else ''
+                    for value in values], dtype='S14')
+    digits = raw.view(np.uint8).reshape(len(raw), 14).astype(np.int64) - 48
+    sizes = np.char.str_len(raw)
+    dates = sizes == 8
+    digits[dates, 8:] = 0
+    valid = (dates | (sizes == 14)) & ((digits >= 0) & (digits <= 9)).all(axis=1)
+
+    def number(start, end):
+        result = np.zeros(len(raw), dtype=np.int64)
+        for i in range(start, end):
+            result = result * 10 + digits[:, i]
+        return result
+
+    year, month, day = number(0, 4), number(4, 6), number(6, 8)
+    hour, minute, second = number(8, 10), number(10, 12), number(12, 14)
+    valid &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (hour < 24) & (minute < 60) & (second < 60)
+
+    months = np.where(valid, (year - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+    days = months.astype('datetime64[D]') + np.where(valid, day - 1, 0)
+    # Day 31 of a 30-day month rolls over into the next month
+    valid &= days.astype('datetime64[M]') == months
+    result = days.astype('datetime64[s]') + (hour * 3600 + minute * 60 + second).astype('timedelta64[s]')
+    result[~valid] = np.datetime64('NaT')
+    return result
     
 def log_to_file(data, folder_path, filename):
     """